@@ -1,46 +1,219 @@
 import random
 import time
-import copy
+from agents.evaluation import evaluate
+from agents.move_ordering import MoveOrderer, ORDERING_MODES
+from agents.search_stats import SearchStats
+from agents.search_tree import SearchTree, PRUNED, TERMINAL, DEPTH_LIMIT, TRANSPOSITION
+from agents.parallel import PARALLEL_MODES, LazySMPSearch, RootParallelSearch
+from agents.transposition_table import SharedTranspositionTable, TranspositionTable, EXACT, LOWER_BOUND, bound_flag, entry_score
+from game.symmetry import get_canonicalizer
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time or node budget of a move runs out."""
+
 
 class AlphaBetaAgent:
-    def __init__(self, mark, max_depth=9):
+    supports_tree_capture = True  # get_move accepts capture_tree
+    supports_stop_flag = True  # get_move accepts stop_flag
+    def __init__(self, mark, max_depth=9, use_tt=False, tt_size=65536, tt_replacement='depth', use_symmetry=False,
+                 tablebase=None, time_limit=None, node_limit=None, move_ordering=None, workers=1,
+                 parallel='root', tree_max_depth=4, tree_max_nodes=5000, tree_share_transpositions=False,
+                 metrics_name='alphabeta'):
         self.mark = mark
         self.opponent_mark = 'O' if mark == 'X' else 'X'
         self.max_depth = max_depth
         self.nodes_evaluated = 0
         self.pruned_branches = 0
-        self.last_tree = None  # For visualization
+        self.stats = SearchStats()  # Per-ply counters behind each move's search report
+        self.last_tree = None  # SearchTree of the last move searched with capture_tree=True, for visualization
+        self.tablebase = tablebase  # Optional solved 3x3 Tablebase (see agents/tablebase.py)
+        self.metrics_name = metrics_name  # Algorithm the searches are recorded under; None records nothing
+
+        # Optional transposition table keyed by the board's Zobrist hash; kept across moves
+        self.tt = TranspositionTable(tt_size, tt_replacement) if use_tt else None
+        # Key the table on the symmetry-canonical position so rotations and mirrors share entries
+        self.use_symmetry = use_symmetry
+
+        # Budgeted mode: deepen one ply at a time until time_limit seconds or node_limit nodes are spent
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self._deadline = None
+        self._node_budget = None
+        self._budgeted = False
+        self._stop_flag = None  # Shared stop flag of a Lazy SMP helper, or the caller's flag during get_move
+        self.last_search_info = None  # Depth reached and per-iteration stats of the last budgeted search
+
+        # Move ordering: None keeps row-major order, 'all' enables every heuristic, or pass a list of ORDERING_MODES
+        if move_ordering == 'all':
+            move_ordering = ORDERING_MODES
+        self.orderer = MoveOrderer(move_ordering) if move_ordering else None
+
+        # Parallel modes use `workers` processes, started once per agent:
+        # 'root' scores root moves on a pool (fixed-depth searches only; budgeted searches stay in-process),
+        # 'lazy_smp' runs workers - 1 helpers on the same position, all sharing one table in shared memory
+        if parallel not in PARALLEL_MODES:
+            raise ValueError(f"Unknown parallel mode: {parallel}")
+        self.workers = workers
+        self.parallel = parallel
+        self._parallel = None
+        self._lazy_smp = None
+        if workers > 1 and parallel == 'lazy_smp':
+            if not use_tt:
+                raise ValueError("Lazy SMP needs use_tt=True: helpers only help through the shared table")
+            self.tt = SharedTranspositionTable(tt_size, tt_replacement)
 
-    def get_move(self, board):
+        # Tree capture is off unless get_move asks for it, and then bounded by these limits
+        self.tree_max_depth = tree_max_depth
+        self.tree_max_nodes = tree_max_nodes
+        self.tree_share_transpositions = tree_share_transpositions
+        self._capture_tree = False
+        self._tree = None  # SearchTree being captured by the current iteration
+
+        self._worker_kwargs = {
+            'mark': mark, 'max_depth': max_depth, 'use_tt': use_tt, 'tt_size': tt_size,
+            'tt_replacement': tt_replacement, 'use_symmetry': use_symmetry, 'move_ordering': move_ordering
+        }
+
+    def get_move(self, board, deadline=None, capture_tree=False, stop_flag=None):
+        """
+        Choose a move for the current position.
+
+        Searches to max_depth, or deepens iteratively when a deadline, time_limit or
+        node_limit is set and returns the best move of the last completed iteration.
+
+        Args:
+            board: The game board
+            deadline (float): Optional absolute time.time() by which the move must be chosen
+            capture_tree (bool): Keep a SearchTree of the search in last_tree, limited to
+                tree_max_depth plies and tree_max_nodes nodes
+            stop_flag: Optional object whose truthy .value (e.g. a multiprocessing.Value set
+                by another thread) ends the search within 128 nodes: a deepening search
+                returns its last completed iteration's move, a fixed-depth one raises
+                SearchTimeout
+
+        Returns:
+            tuple: (row, col)
+        """
         self.nodes_evaluated = 0
-        self.last_tree = {"root": {}}  # Always create root node
+        self.last_tree = None
+        self._capture_tree = capture_tree
 
         start_time = time.time()
+        tt_before = self.tt.get_stats() if self.tt is not None else None
+        pruned_before = self.pruned_branches
         valid_moves = board.get_valid_moves()
 
         if len(valid_moves) == 1:
             return valid_moves[0]
 
-        best_score = float('-inf')
-        best_moves = []
+        # A full-depth search of a solved position is just a tablebase lookup
+        if self.tablebase is not None and len(valid_moves) <= self.max_depth:
+            solved = self.tablebase.lookup(board)
+            if solved is not None:
+                if self.metrics_name is not None:
+                    from utils.metrics import MetricsCollector
+                    MetricsCollector().record_algorithm_stats(self.metrics_name, 0, time.time() - start_time)
+                return random.choice(solved[1])
 
-        root_node = self.last_tree["root"]
-        root_node["children"] = {}
+        if deadline is None and self.time_limit is not None:
+            deadline = start_time + self.time_limit
 
-        for move in valid_moves:
-            board_copy = copy.deepcopy(board)
-            board_copy.make_move(*move, self.mark)
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self.stats.start(board.move_count, len(valid_moves))
 
-            node = {}
-            root_node["children"][str(move)] = node
+        lazy_smp = self.workers > 1 and self.parallel == 'lazy_smp'
+        if deadline is None and self.node_limit is None and self.workers > 1 and not lazy_smp:
+            _, best_moves, nodes, pruned = self._get_parallel_search().search(board, valid_moves, self.max_depth)
+            self.nodes_evaluated += nodes
+            self.pruned_branches += pruned
+        else:
+            if lazy_smp:
+                self._get_lazy_smp().start(board, valid_moves, min(self.max_depth, len(valid_moves)))
+            owner_stop_flag = self._stop_flag
+            if stop_flag is not None:
+                self._stop_flag = stop_flag
+            history_length = len(board.move_history)
+            try:
+                if deadline is None and self.node_limit is None:
+                    # Budget checks only look at the stop flag here: no deadline or node budget is set
+                    self._budgeted = stop_flag is not None
+                    _, best_moves, self.last_tree = self._search_root(board, valid_moves, self.max_depth)
+                else:
+                    best_moves = self._iterative_deepening(board, valid_moves, deadline)
+            except SearchTimeout:
+                self._tree = None
+                while len(board.move_history) > history_length:
+                    board.undo_move()
+                raise
+            finally:
+                self._budgeted = False
+                self._stop_flag = owner_stop_flag
+                # The main search alone picks the move; helper work is only counted
+                if lazy_smp:
+                    nodes, pruned = self._lazy_smp.stop()
+                    self.nodes_evaluated += nodes
+                    self.pruned_branches += pruned
+
+        end_time = time.time()
+
+        if self.metrics_name is not None:
+            from utils.metrics import MetricsCollector
+            metrics = MetricsCollector()
+            metrics.record_algorithm_stats(self.metrics_name, self.nodes_evaluated, end_time - start_time)
+            metrics.record_pruned_branches(self.metrics_name, self.pruned_branches - pruned_before)
+            cache = None
+            if self.tt is not None:
+                tt_after = self.tt.get_stats()
+                cache = {key: tt_after[key] - tt_before[key] for key in ('hits', 'misses', 'stores')}
+                metrics.record_cache_stats(self.metrics_name, cache['hits'], cache['misses'], cache['stores'])
+            metrics.record_ordering_stats(
+                self.metrics_name, self.orderer.label if self.orderer is not None else 'none',
+                self.nodes_evaluated, self.pruned_branches - pruned_before
+            )
+            if deadline is None and self.node_limit is None:
+                depth = min(self.max_depth, len(valid_moves))
+            else:
+                depth = self.last_search_info['depth_reached']
+            metrics.record_search_report(self.metrics_name, self.stats.report(
+                board.move_count + 1, self.nodes_evaluated, end_time - start_time, depth, cache
+            ))
+
+        return random.choice(best_moves)
+
+    def _search_root(self, board, root_moves, depth):
+        """
+        Search every root move to a fixed depth.
+
+        Args:
+            board: The game board
+            root_moves (list): Root moves, in the order to search them
+            depth (int): Search depth including the root move
+
+        Returns:
+            tuple: (best_score, best_moves, tree), where tree is a SearchTree or None
+        """
+        tree = None
+        root_node = None
+        if self._capture_tree:
+            tree = SearchTree(board.size, self.tree_max_depth, self.tree_max_nodes, self.tree_share_transpositions)
+            root_node = tree.add_node(None, key=board.hash)
+        self._tree = tree
+        best_score = float('-inf')
+        best_moves = []
+
+        # Search the caller's board in place, undoing each move afterwards
+        for move in root_moves:
+            board.make_move(*move, self.mark)
+            node = tree.add_node(root_node, move, board.hash) if tree is not None else None
 
             score = self.alpha_beta(
-                board_copy, self.max_depth - 1,
+                board, depth - 1,
                 alpha=float('-inf'), beta=float('inf'),
-                is_maximizing=False, tree_node=node, last_move=None
+                is_maximizing=False, node=node
             )
-
-            node["score"] = score
+            board.undo_move()
 
             if score > best_score:
                 best_score = score
@@ -48,77 +221,280 @@ class AlphaBetaAgent:
             elif score == best_score:
                 best_moves.append(move)
 
-        end_time = time.time()
+        if tree is not None:
+            tree.set_score(root_node, best_score)
+        return best_score, best_moves, tree
 
-        from utils.metrics import MetricsCollector
-        MetricsCollector().record_algorithm_stats('alphabeta', self.nodes_evaluated, end_time - start_time)
+    def _iterative_deepening(self, board, valid_moves, deadline):
+        """
+        Deepen the search one ply at a time until the budget runs out.
 
-        return random.choice(best_moves)
+        Args:
+            board: The game board
+            valid_moves (list): Legal root moves
+            deadline (float): Absolute time.time() limit, or None for a node budget only
 
-    def alpha_beta(self, board, depth, alpha, beta, is_maximizing, tree_node=None, last_move=None):
-        self.nodes_evaluated += 1
+        Returns:
+            list: Best moves of the deepest completed iteration
+        """
+        self.last_search_info = {'depth_reached': 0, 'iterations': []}
+        history_length = len(board.move_history)
+        ordered_moves = list(valid_moves)
+        best_moves = valid_moves
 
-        # Create child node if visualizing
-        if tree_node is not None and last_move is not None:
-            move_key = f"{last_move[0]},{last_move[1]}"
-            if "children" not in tree_node:
-                tree_node["children"] = {}
-            tree_node["children"][move_key] = {
-                "state": copy.deepcopy(board.get_state()),
-                "children": {},
-                "score": None,
-                "pruned": False
-            }
-            current_node = tree_node["children"][move_key]
-        else:
-            current_node = tree_node  # Might be the root
+        for depth in range(1, self.max_depth + 1):
+            iteration_start = time.time()
+            nodes_before = self.nodes_evaluated
+
+            # The first iteration always completes, so there is always a searched move to play
+            if depth > 1:
+                self._deadline = deadline
+                self._node_budget = self.node_limit
+                self._budgeted = True
+            try:
+                score, moves, tree = self._search_root(board, ordered_moves, depth)
+            except SearchTimeout:
+                self._tree = None
+                while len(board.move_history) > history_length:
+                    board.undo_move()
+                break
+            finally:
+                self._deadline = None
+                self._node_budget = None
+                self._budgeted = False
+
+            best_moves = moves
+            self.last_tree = tree
+            self.last_search_info['depth_reached'] = depth
+            self.last_search_info['iterations'].append({
+                'depth': depth,
+                'nodes': self.nodes_evaluated - nodes_before,
+                'time': time.time() - iteration_start,
+                'score': score,
+                'best_moves': moves
+            })
+
+            # Search the previous iteration's best moves first
+            ordered_moves = moves + [move for move in ordered_moves if move not in moves]
+
+            # Once the search reaches the end of the game, deeper iterations cannot change the result
+            if depth >= len(valid_moves):
+                break
+            if deadline is not None and time.time() >= deadline:
+                break
+
+        return best_moves
+
+    def score_root_move(self, board, move, depth, alpha=float('-inf')):
+        """
+        Score a single root move (used by parallel root search workers).
+
+        Args:
+            board: The game board
+            move (tuple): Root (row, col) to play for this agent
+            depth (int): Search depth including the root move
+            alpha (float): Lower bound already achieved by another root move
+
+        Returns:
+            int: Score of the move; an upper bound if it is not above alpha
+        """
+        self.stats.start(board.move_count, board.size * board.size - board.move_count)
+        board.make_move(*move, self.mark)
+        score = self.alpha_beta(board, depth - 1, alpha, float('inf'), False)
+        board.undo_move()
+        return score
+
+    def _get_parallel_search(self):
+        if self._parallel is None:
+            self._parallel = RootParallelSearch(AlphaBetaAgent, self._worker_kwargs, self.workers)
+        return self._parallel
+
+    def _get_lazy_smp(self):
+        if self._lazy_smp is None:
+            helper_kwargs = dict(self._worker_kwargs, use_tt=False)  # Helpers attach to self.tt instead
+            self._lazy_smp = LazySMPSearch(AlphaBetaAgent, helper_kwargs, self.workers - 1, self.tt)
+        return self._lazy_smp
+
+    def close(self):
+        """Release the worker pool and shared table, if they were started."""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+        if self._lazy_smp is not None:
+            self._lazy_smp.close()
+            self._lazy_smp = None
+        if isinstance(self.tt, SharedTranspositionTable):
+            self.tt.close()
+
+    def _check_budget(self):
+        """Raise SearchTimeout once the node budget or deadline of the current move is spent."""
+        if self._node_budget is not None and self.nodes_evaluated > self._node_budget:
+            raise SearchTimeout()
+        # Reading the clock every node is measurable, so only check every 128 nodes
+        if self.nodes_evaluated & 127 == 0:
+            if self._deadline is not None and time.time() >= self._deadline:
+                raise SearchTimeout()
+            if self._stop_flag is not None and self._stop_flag.value:
+                raise SearchTimeout()
+
+    def alpha_beta(self, board, depth, alpha, beta, is_maximizing, node=None):
+        """
+        Score a position with alpha-beta pruning.
+
+        Args:
+            board: The game board
+            depth (int): Remaining search depth
+            alpha (float): Lower end of the search window
+            beta (float): Upper end of the search window
+            is_maximizing (bool): True if this agent is to move
+            node (int): Index of the position in the SearchTree being captured, or None
+
+        Returns:
+            int: Score of the position for this agent
+        """
+        self.nodes_evaluated += 1
+        ply = board.move_count - self.stats.root_move_count
+        self.stats.nodes_by_ply[ply] += 1
+        if self._budgeted:
+            self._check_budget()
+        tree = self._tree if node is not None else None
 
         # Terminal state evaluation
         winner = board.get_winner()
         if winner == self.mark:
-            if current_node:
-                current_node["score"] = 10 + depth
+            self.stats.terminal_leaves += 1
+            if tree is not None:
+                tree.set_score(node, 10 + depth, TERMINAL)
             return 10 + depth
         elif winner == self.opponent_mark:
-            if current_node:
-                current_node["score"] = -10 - depth
+            self.stats.terminal_leaves += 1
+            if tree is not None:
+                tree.set_score(node, -10 - depth, TERMINAL)
             return -10 - depth
-        elif board.is_full() or depth == 0:
-            if current_node:
-                current_node["score"] = 0
+        elif board.is_full():
+            self.stats.terminal_leaves += 1
+            if tree is not None:
+                tree.set_score(node, 0, TERMINAL)
             return 0
+        elif depth == 0:
+            # Depth-limited leaf: score it statically instead of calling it a draw
+            self.stats.depth_limit_leaves += 1
+            score = evaluate(board, self.mark)
+            if tree is not None:
+                tree.set_score(node, score, DEPTH_LIMIT)
+            return score
+
+        # Transposition table lookup: reuse an exact score or narrow the window with a bound
+        pv_move = None
+        if self.tt is not None:
+            tt_key, tt_transform = self._tt_key(board)
+            entry = self.tt.probe(tt_key)
+            tt_score = entry_score(entry, depth) if entry is not None else None
+            if entry is not None and entry[4] is not None:
+                pv_move = entry[4]
+                if self.use_symmetry:
+                    pv_move = get_canonicalizer(board.size).inverse_transform_move(pv_move, tt_transform)
+            if tt_score is not None:
+                if entry[3] == EXACT:
+                    self.stats.tt_cutoffs += 1
+                    if tree is not None:
+                        tree.set_score(node, tt_score, TRANSPOSITION)
+                    return tt_score
+                elif entry[3] == LOWER_BOUND:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if beta <= alpha:
+                    self.stats.tt_cutoffs += 1
+                    if tree is not None:
+                        tree.set_score(node, tt_score, TRANSPOSITION)
+                    return tt_score
+        alpha_searched, beta_searched = alpha, beta
+        best_move = None
 
         valid_moves = board.get_valid_moves()
+        if self.orderer is not None:
+            mover = self.mark if is_maximizing else self.opponent_mark
+            valid_moves = self.orderer.order(board, valid_moves, mover, board.move_count, pv_move)
 
         if is_maximizing:
             max_score = float('-inf')
+            flags = 0
             for move in valid_moves:
-                board_copy = copy.deepcopy(board)
-                board_copy.make_move(*move, self.mark)
-                score = self.alpha_beta(board_copy, depth - 1, alpha, beta, False, current_node, move)
+                board.make_move(*move, self.mark)
+                child = tree.add_node(node, move, board.hash) if tree is not None else None
+                score = self.alpha_beta(board, depth - 1, alpha, beta, False, child)
+                board.undo_move()
+                if score > max_score:
+                    best_move = move
                 max_score = max(max_score, score)
                 alpha = max(alpha, max_score)
                 if beta <= alpha:
                     self.pruned_branches += 1
-                    if current_node:
-                        current_node["pruned"] = True
+                    self.stats.cutoffs_by_ply[ply] += 1
+                    if self.orderer is not None:
+                        self.orderer.record_cutoff(move, self.mark, board.move_count, depth)
+                    flags = PRUNED
                     break
-            if current_node:
-                current_node["score"] = max_score
+            if tree is not None:
+                tree.set_score(node, max_score, flags)
+            if self.tt is not None:
+                self._tt_store(board, tt_key, tt_transform, depth, max_score, alpha_searched, beta_searched, best_move)
             return max_score
         else:
             min_score = float('inf')
+            flags = 0
             for move in valid_moves:
-                board_copy = copy.deepcopy(board)
-                board_copy.make_move(*move, self.opponent_mark)
-                score = self.alpha_beta(board_copy, depth - 1, alpha, beta, True, current_node, move)
+                board.make_move(*move, self.opponent_mark)
+                child = tree.add_node(node, move, board.hash) if tree is not None else None
+                score = self.alpha_beta(board, depth - 1, alpha, beta, True, child)
+                board.undo_move()
+                if score < min_score:
+                    best_move = move
                 min_score = min(min_score, score)
                 beta = min(beta, min_score)
                 if beta <= alpha:
                     self.pruned_branches += 1
-                    if current_node:
-                        current_node["pruned"] = True
+                    self.stats.cutoffs_by_ply[ply] += 1
+                    if self.orderer is not None:
+                        self.orderer.record_cutoff(move, self.opponent_mark, board.move_count, depth)
+                    flags = PRUNED
                     break
-            if current_node:
-                current_node["score"] = min_score
+            if tree is not None:
+                tree.set_score(node, min_score, flags)
+            if self.tt is not None:
+                self._tt_store(board, tt_key, tt_transform, depth, min_score, alpha_searched, beta_searched, best_move)
             return min_score
+
+    def _tt_key(self, board):
+        """
+        Get the transposition table key of a position.
+
+        Args:
+            board: The game board
+
+        Returns:
+            tuple: (key, transform) where transform maps real moves into the key's frame
+        """
+        if self.use_symmetry:
+            return get_canonicalizer(board.size).canonicalize(board)
+        return board.hash, 0
+
+    def _tt_store(self, board, key, transform, depth, score, alpha, beta, best_move):
+        """
+        Store a node result in the transposition table with its bound type.
+
+        Args:
+            board: The game board at the node
+            key (int): Transposition table key of the node
+            transform (int): Symmetry mapping real moves into the key's frame
+            depth (int): Remaining search depth at the node
+            score (int): Score returned for the node
+            alpha (float): Lower end of the window the node was searched with
+            beta (float): Upper end of the window the node was searched with
+            best_move (tuple): Best (row, col) found at the node
+        """
+        flag = bound_flag(score, alpha, beta)
+        if self.use_symmetry and best_move is not None:
+            best_move = get_canonicalizer(board.size).transform_move(best_move, transform)
+        self.tt.store(key, depth, score, flag, best_move)
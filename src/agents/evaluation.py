@@ -0,0 +1,77 @@
+import numpy as np
+from game.board import get_lines
+
+# Static scores stay strictly inside the win (10 + depth) and loss (-10 - depth) scores
+MAX_EVAL = 9
+
+_LINE_MATRICES = {}
+
+
+def get_line_matrix(size, win_length):
+    """
+    Get the line-index matrix for a board shape.
+
+    Args:
+        size (int): The size of the board
+        win_length (int): Number of marks in a row needed to win
+
+    Returns:
+        numpy.ndarray: (num_lines, win_length) array of flat cell indices
+    """
+    key = (size, win_length)
+    matrix = _LINE_MATRICES.get(key)
+    if matrix is None:
+        lines, _ = get_lines(size, win_length)
+        matrix = np.array(lines, dtype=np.intp)
+        _LINE_MATRICES[key] = matrix
+    return matrix
+
+
+def evaluate_batch(states, mark, win_length):
+    """
+    Score many positions at once from one player's point of view.
+
+    Every winning line is classified in one vectorized pass: lines holding only one
+    player's marks are open for that player and are worth 4**k - 1 for k marks, so a
+    line one mark short of winning (a threat) dominates; lines holding both marks are
+    blocked and worth nothing. The difference is squashed into [-MAX_EVAL, MAX_EVAL].
+
+    Args:
+        states (numpy.ndarray): (batch, size, size) array of ' ', 'X' and 'O'
+        mark (str): Mark of the player to score for ('X' or 'O')
+        win_length (int): Number of marks in a row needed to win
+
+    Returns:
+        numpy.ndarray: (batch,) array of integer scores
+    """
+    states = np.asarray(states)
+    batch, size = states.shape[0], states.shape[1]
+    opponent = 'O' if mark == 'X' else 'X'
+    matrix = get_line_matrix(size, win_length)
+
+    cells = states.reshape(batch, size * size)[:, matrix]  # (batch, num_lines, win_length)
+    mine = (cells == mark).sum(axis=2)
+    theirs = (cells == opponent).sum(axis=2)
+
+    weights = 4 ** np.arange(win_length + 1) - 1
+    open_mine = np.where(theirs == 0, weights[mine], 0).sum(axis=1)
+    open_theirs = np.where(mine == 0, weights[theirs], 0).sum(axis=1)
+
+    # One open threat maps to about three quarters of MAX_EVAL
+    scale = weights[win_length - 1]
+    scores = MAX_EVAL * np.tanh((open_mine - open_theirs) / scale)
+    return np.rint(scores).astype(int)
+
+
+def evaluate(board, mark):
+    """
+    Score a single non-terminal position from one player's point of view.
+
+    Args:
+        board: The game board
+        mark (str): Mark of the player to score for ('X' or 'O')
+
+    Returns:
+        int: Score in [-MAX_EVAL, MAX_EVAL]
+    """
+    return int(evaluate_batch(board.get_state()[np.newaxis], mark, board.win_length)[0])
@@ -0,0 +1,24 @@
+from agents.human_agent import HumanAgent
+from agents.minimax_agent import MinimaxAgent
+from agents.alphabeta_agent import AlphaBetaAgent
+from agents.negamax_agent import NegamaxAgent
+
+AGENT_TYPES = ('human', 'minimax', 'alphabeta', 'negamax', 'gemini')
+
+
+def get_agent(agent_type, mark, depth=9, time_limit=None):
+    """Returns the appropriate agent based on the selected type."""
+    if agent_type == 'human':
+        return HumanAgent(mark)
+    elif agent_type == 'minimax':
+        return MinimaxAgent(mark, depth, time_limit=time_limit)
+    elif agent_type == 'alphabeta':
+        return AlphaBetaAgent(mark, depth, time_limit=time_limit)
+    elif agent_type == 'negamax':
+        return NegamaxAgent(mark, depth, time_limit=time_limit)
+    elif agent_type == 'gemini':
+        # Only Gemini games need the API client
+        from agents.gemini_agent import GeminiAgent
+        return GeminiAgent(mark)
+    else:
+        raise ValueError(f"Unknown agent type: {agent_type}")
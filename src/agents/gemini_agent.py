@@ -2,21 +2,66 @@ import time
 import json
 import os
 import random
-import google.generativeai as genai
-from dotenv import load_dotenv
+import re
+import multiprocessing
+import concurrent.futures
+from agents.response_cache import get_response_cache
+
+# One complete `"n": "row,col"` (or `"n": [row, col]`) entry of a batch answer
+_BATCH_ENTRY = re.compile(r'"(\d+)"\s*:\s*(?:"(\d+)\s*,\s*(\d+)"|\[\s*(\d+)\s*,\s*(\d+)\s*\])')
 
 class GeminiAgent:
-    def __init__(self, mark):
+    supports_stop_flag = True  # get_move accepts stop_flag
+
+    def __init__(self, mark, model=None, use_cache=True, cache_path=None, cache_size=4096, timeout=10.0,
+                 hedge_after=None, fallback_depth=9):
         """
         Initialize the Gemini API agent.
 
         Args:
             mark (str): The player's mark ('X' or 'O')
+            model: Object with a generate_content(prompt) method returning a response with
+                .text, used instead of the Gemini API (e.g. a local fake in tests)
+            use_cache (bool): Answer positions seen before from the shared response cache
+            cache_path (str): File the cache persists to between runs (e.g.
+                agents.response_cache.DEFAULT_PATH), or None to keep it in memory
+            cache_size (int): Most positions the cache holds
+            timeout (float): Seconds a move may take; past it the local search move is played.
+                None waits for the API however long it takes
+            hedge_after (float): Seconds after which a second, identical request is sent if the
+                first has not answered (None sends one request)
+            fallback_depth (int): Depth of the AlphaBetaAgent searching alongside each request,
+                whose move is played on timeout, error or invalid answer (None falls back to
+                a random move)
         """
         self.mark = mark
         self.opponent_mark = 'O' if mark == 'X' else 'X'
         self.nodes_evaluated = 0  # For compatibility with metrics
 
+        # One cache per file is shared by every agent in the process, so later games reuse it
+        self.cache = get_response_cache(cache_path, cache_size) if use_cache else None
+
+        # Requests and the fallback search run on worker threads so a move never waits past timeout
+        self.timeout = timeout
+        self.hedge_after = hedge_after
+        self.fallback = None
+        self._fallback_stop = None
+        self._executor = None
+        if fallback_depth is not None:
+            from agents.alphabeta_agent import AlphaBetaAgent
+            # Its searches are part of the Gemini move, so they stay out of the alphabeta metrics
+            self.fallback = AlphaBetaAgent(mark, fallback_depth, use_tt=True, move_ordering='all', metrics_name=None)
+            self._fallback_stop = multiprocessing.Value('b', 0)  # Ends the search once the API answers
+
+        if model is not None:
+            self.model = model
+            self.api_configured = True
+            return
+
+        # The API client and dotenv are slow to import, so only Gemini games pay for them
+        import google.generativeai as genai
+        from dotenv import load_dotenv
+
         # Load API key from .env or fallback to config JSON
         load_dotenv()
         api_key = os.getenv("GEMINI_API_KEY")
@@ -42,12 +87,14 @@ class GeminiAgent:
                 print(f"⚠️ Error configuring Gemini API: {e}. Using random moves instead.")
                 self.api_configured = False
 
-    def get_move(self, board):
+    def get_move(self, board, stop_flag=None):
         """
         Get the best move using the Gemini API.
 
         Args:
             board: The game board
+            stop_flag: Optional object whose truthy .value (set by another thread) abandons
+                the requests and raises SearchTimeout; only honoured when timeout is set
 
         Returns:
             tuple: (row, col)
@@ -59,11 +106,197 @@ class GeminiAgent:
         if not self.api_configured:
             return random.choice(valid_moves)
 
+        start_time = time.time()
+        if self.cache is not None:
+            move = self.cache.get(board, self.mark)
+            from utils.metrics import MetricsCollector
+            metrics = MetricsCollector()
+            if move is not None and move in valid_moves:
+                metrics.record_cache_stats('gemini', 1, 0, 0)
+                metrics.record_algorithm_stats('gemini', 0, time.time() - start_time)
+                return move
+            metrics.record_cache_stats('gemini', 0, 1, 0)
+
+        prompt = self._build_prompt(board, valid_moves)
+        if self.timeout is None:
+            try:
+                move = self._request_move(prompt, valid_moves)
+                answered = True
+            except Exception as e:
+                print(f"⚠️ Error using Gemini API: {e}. Using random move instead.")
+                move, answered = random.choice(valid_moves), False
+        else:
+            move, answered = self._request_move_by_deadline(
+                board, prompt, valid_moves, start_time + self.timeout, stop_flag
+            )
+
+        # Timed-out and failed moves are the slowest ones, so their time counts too (with no answer node)
+        from utils.metrics import MetricsCollector
+        metrics = MetricsCollector()
+        metrics.record_algorithm_stats('gemini', 1 if answered else 0, time.time() - start_time)
+        if not answered:
+            return move
+        if self.cache is not None:
+            self.cache.put(board, self.mark, move)
+            metrics.record_cache_stats('gemini', 0, 0, 1)
+        print(f"✅ Gemini chose move: {move}")
+        return move
+
+    def get_moves_batch(self, boards):
+        """
+        Choose moves for many independent positions with one API request.
+
+        Every position must have this agent's mark to move. Cached positions are not
+        sent. Answers that are missing or not in the position's get_valid_moves() are
+        replaced by the fallback search's move (or a random one). The request is
+        bounded by timeout like get_move.
+
+        Args:
+            boards (list): Game boards, e.g. from concurrently running games
+
+        Returns:
+            list: One (row, col) per board, in order
+        """
+        start_time = time.time()
+        from utils.metrics import MetricsCollector
+        metrics = MetricsCollector()
+        moves = [None] * len(boards)
+        valid_moves = [board.get_valid_moves() for board in boards]
+
+        pending = []
+        for index, board in enumerate(boards):
+            if len(valid_moves[index]) == 1:
+                moves[index] = valid_moves[index][0]
+            elif not self.api_configured:
+                moves[index] = random.choice(valid_moves[index])
+            elif self.cache is not None:
+                move = self.cache.get(board, self.mark)
+                if move is not None and move in valid_moves[index]:
+                    metrics.record_cache_stats('gemini', 1, 0, 0)
+                    moves[index] = move
+                else:
+                    metrics.record_cache_stats('gemini', 0, 1, 0)
+                    pending.append(index)
+            else:
+                pending.append(index)
+        if not pending:
+            return moves
+
+        deadline = start_time + self.timeout if self.timeout is not None else None
+        prompt = self._build_batch_prompt([boards[index] for index in pending],
+                                          [valid_moves[index] for index in pending])
+        answers = {}
+        try:
+            if deadline is None:
+                answers = self._request_moves(prompt)
+            else:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="gemini")
+                answers = self._executor.submit(self._request_moves, prompt).result(timeout=deadline - time.time())
+        except concurrent.futures.TimeoutError:
+            print(f"⚠️ Gemini did not answer a batch of {len(pending)} positions within {self.timeout}s.")
+        except Exception as e:
+            print(f"⚠️ Error using Gemini API for a batch of {len(pending)} positions: {e}")
+
+        answered = 0
+        for number, index in enumerate(pending, 1):
+            move = answers.get(number)
+            if move in valid_moves[index]:
+                moves[index] = move
+                answered += 1
+                if self.cache is not None:
+                    self.cache.put(boards[index], self.mark, move)
+                    metrics.record_cache_stats('gemini', 0, 0, 1)
+            elif self.fallback is not None and deadline is not None:
+                # Searches share what is left of the batch deadline; each completes at least one ply
+                self._fallback_stop.value = 0
+                moves[index] = self.fallback.get_move(boards[index], deadline, stop_flag=self._fallback_stop)
+            else:
+                moves[index] = random.choice(valid_moves[index])
+        if answered < len(pending):
+            print(f"⚠️ Gemini answered {answered} of {len(pending)} positions; the rest use fallback moves.")
+        metrics.record_algorithm_stats('gemini', answered, time.time() - start_time)
+        return moves
+
+    def _build_batch_prompt(self, boards, valid_moves):
+        """
+        Build one request for several positions.
+
+        Args:
+            boards (list): Game boards
+            valid_moves (list): Legal moves of each board
+
+        Returns:
+            str: The prompt
+        """
+        positions = "\n".join(
+            f"""
+            Position {number} ({board.size}x{board.size}):
+            {self._board_to_string(board)}
+            Valid moves: {moves}
+            """
+            for number, (board, moves) in enumerate(zip(boards, valid_moves), 1)
+        )
+        return f"""
+            You are playing {len(boards)} independent games of Tic-Tac-Toe as player '{self.mark}'.
+            The opponent is '{self.opponent_mark}'. Choose a move for each position.
+            {positions}
+            Only respond with a JSON object mapping each position number to one move from its
+            list, using the format "row,col". Example: {{"1": "1,2", "2": "0,0"}}
+            """
+
+    def _request_moves(self, prompt):
+        """
+        Ask the model for a batch of moves and parse its JSON answer.
+
+        Args:
+            prompt (str): The batch request
+
+        Returns:
+            dict: Position number -> (row, col) for every entry that parses; a truncated
+                or malformed object still yields its complete entries
+
+        Raises:
+            ValueError: If the answer is empty or holds no JSON object
+        """
+        response = self.model.generate_content(prompt)
+        if not response or not response.text:
+            raise ValueError("Gemini API returned an empty response.")
+
+        # Models often wrap JSON in a code fence or a sentence: take the outermost object
+        text = response.text
+        start, end = text.find('{'), text.rfind('}')
+        if start < 0:
+            raise ValueError(f"Gemini returned no JSON object: {text[:80]!r}")
         try:
-            start_time = time.time()
-            board_str = self._board_to_string(board)
+            entries = json.loads(text[start:end + 1]).items()
+        except (ValueError, AttributeError):
+            # Cut off or otherwise broken: keep the entries that were written out in full
+            entries = [(number, f"{row or list_row},{col or list_col}")
+                       for number, row, col, list_row, list_col in _BATCH_ENTRY.findall(text[start:])]
+        answers = {}
+        for number, value in entries:
+            try:
+                row, col = value.split(',') if isinstance(value, str) else value
+                answers[int(number)] = (int(row), int(col))
+            except (TypeError, ValueError):
+                continue
+        return answers
+
+    def _build_prompt(self, board, valid_moves):
+        """
+        Build the move request for a position.
 
-            prompt = f"""
+        Args:
+            board: The game board
+            valid_moves (list): Legal moves
+
+        Returns:
+            str: The prompt
+        """
+        board_str = self._board_to_string(board)
+
+        return f"""
             You are playing Tic-Tac-Toe as player '{self.mark}'.
             The opponent is '{self.opponent_mark}'.
 
@@ -76,26 +309,128 @@ class GeminiAgent:
             Example: 1,2
             """
 
-            response = self.model.generate_content(prompt)
-            if not response or not response.text:
-                raise ValueError("Gemini API returned an empty response.")
+    def _request_move(self, prompt, valid_moves):
+        """
+        Ask the model for a move and parse its answer.
 
-            response_text = response.text.strip()
-            row_str, col_str = response_text.split(',')
-            move = (int(row_str.strip()), int(col_str.strip()))
+        Args:
+            prompt (str): The move request
+            valid_moves (list): Legal moves
 
-            if move in valid_moves:
-                from utils.metrics import MetricsCollector
-                MetricsCollector().record_algorithm_stats('gemini', 1, time.time() - start_time)
-                print(f"✅ Gemini chose move: {move}")
-                return move
-            else:
-                print(f"⚠️ Gemini returned invalid move: {move}. Using random move instead.")
-                return random.choice(valid_moves)
+        Returns:
+            tuple: (row, col)
 
-        except Exception as e:
-            print(f"⚠️ Error using Gemini API: {e}. Using random move instead.")
-            return random.choice(valid_moves)
+        Raises:
+            ValueError: If the answer is empty, unparseable or not a legal move
+        """
+        response = self.model.generate_content(prompt)
+        if not response or not response.text:
+            raise ValueError("Gemini API returned an empty response.")
+
+        response_text = response.text.strip()
+        row_str, col_str = response_text.split(',')
+        move = (int(row_str.strip()), int(col_str.strip()))
+        if move not in valid_moves:
+            raise ValueError(f"Gemini returned invalid move: {move}")
+        return move
+
+    def _request_move_by_deadline(self, board, prompt, valid_moves, deadline, stop_flag=None):
+        """
+        Ask the model for a move on a worker thread while the fallback searches on another.
+
+        A hedged second request goes out after hedge_after seconds, or as soon as the
+        first request fails. The first legal answer wins and stops the fallback search;
+        without one, the search runs until it completes or the deadline passes.
+        Requests still running at the deadline are abandoned (their threads finish on
+        their own).
+
+        Args:
+            board: The game board
+            prompt (str): The move request
+            valid_moves (list): Legal moves
+            deadline (float): Absolute time.time() by which the move must be chosen
+            stop_flag: Optional object whose truthy .value abandons the move
+
+        Returns:
+            tuple: ((row, col), answered) where answered is False if the move is the fallback's
+
+        Raises:
+            SearchTimeout: If stop_flag was set before a move was chosen
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="gemini")
+
+        search = None
+        if self.fallback is not None:
+            # The search plays on its own copy, so the caller's board is never touched off-thread
+            search_board = type(board)(board.size)
+            for row, col, mark in board.move_history:
+                search_board.make_move(row, col, mark)
+            self._fallback_stop.value = 0
+            search = self._executor.submit(
+                self.fallback.get_move, search_board, deadline, stop_flag=self._fallback_stop
+            )
+
+        pending = {self._executor.submit(self._request_move, prompt, valid_moves)}
+        hedged = self.hedge_after is None
+        hedge_time = None if hedged else time.time() + self.hedge_after
+        move = None
+        stopped = False
+        while move is None:
+            now = time.time()
+            if stop_flag is not None and stop_flag.value:
+                stopped = True
+                break
+            if now >= deadline:
+                print(f"⚠️ Gemini did not answer within {self.timeout}s.")
+                break
+            if not pending:
+                if hedged:
+                    break
+                hedge_time = now  # The first request failed: hedge right away
+            if not hedged and now >= hedge_time:
+                pending.add(self._executor.submit(self._request_move, prompt, valid_moves))
+                hedged = True
+                continue
+            wait_until = deadline if hedged else min(deadline, hedge_time)
+            if stop_flag is not None:
+                wait_until = min(wait_until, now + 0.1)  # Wake up regularly to look at the stop flag
+            done, pending = concurrent.futures.wait(pending, timeout=wait_until - now,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    move = future.result()
+                    break
+                print(f"⚠️ Error using Gemini API: {future.exception()}")
+
+        if move is None and not stopped and search is not None and stop_flag is not None:
+            # The search runs on to the deadline, but a stop request still ends it
+            while not search.done() and not stopped:
+                concurrent.futures.wait([search], timeout=0.1)
+                stopped = bool(stop_flag.value)
+
+        if move is not None or stopped:
+            if search is not None:
+                self._fallback_stop.value = 1  # Only an answer from the API (or a stop) cuts the search short
+                search.result()
+            if stopped:
+                from agents.alphabeta_agent import SearchTimeout
+                raise SearchTimeout()
+            return move, True
+
+        # Every request failed or timed out: the search keeps its whole budget up to the deadline
+        fallback_move = search.result() if search is not None else random.choice(valid_moves)
+        source = "local search" if search is not None else "random"
+        print(f"⚠️ Using {source} move instead: {fallback_move}")
+        return fallback_move, False
+
+    def close(self):
+        """Save the response cache, if it persists to a file, and release the worker threads."""
+        if self.cache is not None:
+            self.cache.save()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
 
     def _board_to_string(self, board):
         """
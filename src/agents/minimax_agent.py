@@ -1,17 +1,45 @@
 import random
 import time
-import copy
+from agents.alphabeta_agent import SearchTimeout
+from agents.evaluation import evaluate
+from agents.parallel import RootParallelSearch
+from agents.search_stats import SearchStats
+from agents.search_tree import SearchTree, TERMINAL, DEPTH_LIMIT
 
 class MinimaxAgent:
-    def __init__(self, mark, max_depth=9):
+    supports_tree_capture = True  # get_move accepts capture_tree
+    supports_stop_flag = True  # get_move accepts stop_flag
+
+    def __init__(self, mark, max_depth=9, tablebase=None, workers=1, tree_max_depth=4, tree_max_nodes=5000,
+                 time_limit=None):
         self.mark = mark
         self.opponent_mark = 'O' if mark == 'X' else 'X'
         self.max_depth = max_depth
         self.nodes_evaluated = 0
-        self.last_tree = None
+        self.stats = SearchStats()  # Per-ply counters behind each move's search report
+        self.last_tree = None  # SearchTree of the last move searched with capture_tree=True, for visualization
+        self.tablebase = tablebase  # Optional solved 3x3 Tablebase (see agents/tablebase.py)
+
+        # Budgeted mode: deepen one ply at a time until time_limit seconds are spent
+        self.time_limit = time_limit
+        self._deadline = None
+        self._budgeted = False
+
+        # Root-parallel mode (fixed-depth searches only): score root moves on a pool of `workers` processes, started once per agent
+        self.workers = workers
+        self._parallel = None
+
+        # Tree capture is off unless get_move asks for it, and then bounded by these limits
+        self.tree_max_depth = tree_max_depth
+        self.tree_max_nodes = tree_max_nodes
+        self._tree = None
+        self._stop_flag = None  # Caller's stop flag during get_move
 
-    def get_move(self, board):
+    def get_move(self, board, capture_tree=False, stop_flag=None, deadline=None):
+        # A truthy stop_flag.value, set from another thread, ends the search within 128 nodes: a deepening
+        # search (deadline or time_limit set) keeps its last completed iteration, a fixed-depth one raises SearchTimeout
         self.nodes_evaluated = 0
+        self.last_tree = None
         start_time = time.time()
 
         valid_moves = board.get_valid_moves()
@@ -19,90 +47,231 @@ class MinimaxAgent:
         if len(valid_moves) == 1:
             return valid_moves[0]
 
-        # Prepare tree visualization structure
-        self.last_tree = {"root": {"state": copy.deepcopy(board.get_state()), "children": {}}}
-        root_node = self.last_tree["root"]
+        # A full-depth search of a solved position is just a tablebase lookup
+        if self.tablebase is not None and len(valid_moves) <= self.max_depth:
+            solved = self.tablebase.lookup(board)
+            if solved is not None:
+                from utils.metrics import MetricsCollector
+                MetricsCollector().record_algorithm_stats('minimax', 0, time.time() - start_time)
+                return random.choice(solved[1])
+
+        if deadline is None and self.time_limit is not None:
+            deadline = start_time + self.time_limit
+
+        self.stats.start(board.move_count, len(valid_moves))
+        depth_reached = min(self.max_depth, len(valid_moves))
+        if self.workers > 1 and deadline is None:
+            _, best_moves, nodes, _ = self._get_parallel_search().search(board, valid_moves, self.max_depth)
+            self.nodes_evaluated += nodes
+        else:
+            self._stop_flag = stop_flag
+            try:
+                if deadline is None:
+                    # Budget checks only look at the stop flag here
+                    self._budgeted = stop_flag is not None
+                    _, best_moves, self.last_tree = self._search_root(board, valid_moves, self.max_depth, capture_tree)
+                else:
+                    best_moves, depth_reached = self._iterative_deepening(board, valid_moves, deadline, capture_tree)
+            finally:
+                self._stop_flag = None
+                self._budgeted = False
+
+        end_time = time.time()
+
+        from utils.metrics import MetricsCollector
+        metrics = MetricsCollector()
+        metrics.record_algorithm_stats('minimax', self.nodes_evaluated, end_time - start_time)
+        metrics.record_search_report('minimax', self.stats.report(
+            board.move_count + 1, self.nodes_evaluated, end_time - start_time, depth_reached
+        ))
+
+        return random.choice(best_moves)
+
+    def _search_root(self, board, root_moves, depth, capture_tree):
+        """
+        Score every root move to a fixed depth, on the caller's board in place.
+
+        Args:
+            board: The game board
+            root_moves (list): Root moves, in search order
+            depth (int): Search depth including the root move
+            capture_tree (bool): Capture a SearchTree of the search
+
+        Returns:
+            tuple: (best score, best moves, SearchTree or None)
+        """
+        tree = None
+        root_node = None
+        if capture_tree:
+            tree = SearchTree(board.size, self.tree_max_depth, self.tree_max_nodes)
+            root_node = tree.add_node(None)
+        self._tree = tree
 
         best_score = float('-inf')
         best_moves = []
+        history_length = len(board.move_history)
+        try:
+            for move in root_moves:
+                board.make_move(*move, self.mark)
+                node = tree.add_node(root_node, move) if tree is not None else None
 
-        for move in valid_moves:
-            board_copy = copy.deepcopy(board)
-            board_copy.make_move(*move, self.mark)
+                score = self.minimax(board, depth - 1, False, float('-inf'), float('inf'), node)
+                board.undo_move()
 
-            node = {}
-            root_node["children"][str(move)] = node
+                if score > best_score:
+                    best_score = score
+                    best_moves = [move]
+                elif score == best_score:
+                    best_moves.append(move)
+        except SearchTimeout:
+            while len(board.move_history) > history_length:
+                board.undo_move()
+            raise
+        finally:
+            self._tree = None
 
-            score = self.minimax(
-                board_copy, self.max_depth - 1, False,
-                float('-inf'), float('inf'), node
-            )
-            node["score"] = score
+        if tree is not None:
+            tree.set_score(root_node, best_score)
+        return best_score, best_moves, tree
 
-            if score > best_score:
-                best_score = score
-                best_moves = [move]
-            elif score == best_score:
-                best_moves.append(move)
+    def _iterative_deepening(self, board, valid_moves, deadline, capture_tree):
+        """
+        Deepen the search one ply at a time until the deadline passes.
 
-        end_time = time.time()
+        Args:
+            board: The game board
+            valid_moves (list): Legal root moves
+            deadline (float): Absolute time.time() limit
+            capture_tree (bool): Keep the SearchTree of the deepest completed iteration
 
-        from utils.metrics import MetricsCollector
-        MetricsCollector().record_algorithm_stats('minimax', self.nodes_evaluated, end_time - start_time)
+        Returns:
+            tuple: (best moves of the deepest completed iteration, its depth)
+        """
+        ordered_moves = list(valid_moves)
+        best_moves = valid_moves
+        depth_reached = 0
 
-        return random.choice(best_moves)
+        # Searching past the end of the game cannot change the result
+        for depth in range(1, min(self.max_depth, len(valid_moves)) + 1):
+            # The first iteration always completes, so there is always a searched move to play
+            if depth > 1:
+                self._deadline = deadline
+                self._budgeted = True
+            try:
+                _, moves, tree = self._search_root(board, ordered_moves, depth, capture_tree)
+            except SearchTimeout:
+                break
+            finally:
+                self._deadline = None
+                self._budgeted = False
+
+            best_moves = moves
+            self.last_tree = tree
+            depth_reached = depth
+
+            # Search the previous iteration's best moves first
+            ordered_moves = moves + [move for move in ordered_moves if move not in moves]
+
+            if time.time() >= deadline:
+                break
+
+        return best_moves, depth_reached
+
+    def _check_budget(self):
+        """Raise SearchTimeout once the deadline of the current move passes, or on a stop request."""
+        if self._deadline is not None and time.time() >= self._deadline:
+            raise SearchTimeout()
+        if self._stop_flag is not None and self._stop_flag.value:
+            raise SearchTimeout()
+
+    def score_root_move(self, board, move, depth, alpha=float('-inf')):
+        """
+        Score a single root move (used by parallel root search workers).
 
-    def minimax(self, board, depth, is_maximizing, alpha, beta, tree_node=None):
+        Args:
+            board: The game board
+            move (tuple): Root (row, col) to play for this agent
+            depth (int): Search depth including the root move
+            alpha (float): Unused; minimax does not prune
+
+        Returns:
+            int: Score of the move
+        """
+        self.stats.start(board.move_count, board.size * board.size - board.move_count)
+        board.make_move(*move, self.mark)
+        score = self.minimax(board, depth - 1, False, float('-inf'), float('inf'))
+        board.undo_move()
+        return score
+
+    def _get_parallel_search(self):
+        if self._parallel is None:
+            self._parallel = RootParallelSearch(
+                MinimaxAgent, {'mark': self.mark, 'max_depth': self.max_depth}, self.workers, share_bound=False
+            )
+        return self._parallel
+
+    def close(self):
+        """Release the worker pool, if one was started."""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
+    def minimax(self, board, depth, is_maximizing, alpha, beta, node=None):
         self.nodes_evaluated += 1
+        # Reading the clock every node is measurable, so only check every 128 nodes
+        if self._budgeted and self.nodes_evaluated & 127 == 0:
+            self._check_budget()
+        self.stats.nodes_by_ply[board.move_count - self.stats.root_move_count] += 1
+        tree = self._tree if node is not None else None
 
         winner = board.get_winner()
         if winner == self.mark:
-            if tree_node is not None:
-                tree_node["score"] = 10 + depth
+            self.stats.terminal_leaves += 1
+            if tree is not None:
+                tree.set_score(node, 10 + depth, TERMINAL)
             return 10 + depth
         elif winner == self.opponent_mark:
-            if tree_node is not None:
-                tree_node["score"] = -10 - depth
+            self.stats.terminal_leaves += 1
+            if tree is not None:
+                tree.set_score(node, -10 - depth, TERMINAL)
             return -10 - depth
-        elif board.is_full() or depth == 0:
-            if tree_node is not None:
-                tree_node["score"] = 0
+        elif board.is_full():
+            self.stats.terminal_leaves += 1
+            if tree is not None:
+                tree.set_score(node, 0, TERMINAL)
             return 0
+        elif depth == 0:
+            # Depth-limited leaf: score it statically instead of calling it a draw
+            self.stats.depth_limit_leaves += 1
+            score = evaluate(board, self.mark)
+            if tree is not None:
+                tree.set_score(node, score, DEPTH_LIMIT)
+            return score
 
         valid_moves = board.get_valid_moves()
-        if tree_node is not None:
-            tree_node["children"] = {}
 
         if is_maximizing:
             max_score = float('-inf')
             for move in valid_moves:
-                board_copy = copy.deepcopy(board)
-                board_copy.make_move(*move, self.mark)
-
-                child_node = {}
-                if tree_node is not None:
-                    tree_node["children"][str(move)] = child_node
-
-                score = self.minimax(board_copy, depth - 1, False, alpha, beta, child_node)
+                board.make_move(*move, self.mark)
+                child = tree.add_node(node, move) if tree is not None else None
+                score = self.minimax(board, depth - 1, False, alpha, beta, child)
+                board.undo_move()
                 max_score = max(max_score, score)
                 alpha = max(alpha, score)
-            if tree_node is not None:
-                tree_node["score"] = max_score
+            if tree is not None:
+                tree.set_score(node, max_score)
             return max_score
 
         else:
             min_score = float('inf')
             for move in valid_moves:
-                board_copy = copy.deepcopy(board)
-                board_copy.make_move(*move, self.opponent_mark)
-
-                child_node = {}
-                if tree_node is not None:
-                    tree_node["children"][str(move)] = child_node
-
-                score = self.minimax(board_copy, depth - 1, True, alpha, beta, child_node)
+                board.make_move(*move, self.opponent_mark)
+                child = tree.add_node(node, move) if tree is not None else None
+                score = self.minimax(board, depth - 1, True, alpha, beta, child)
+                board.undo_move()
                 min_score = min(min_score, score)
                 beta = min(beta, score)
-            if tree_node is not None:
-                tree_node["score"] = min_score
+            if tree is not None:
+                tree.set_score(node, min_score)
             return min_score
@@ -0,0 +1,94 @@
+from game.board import get_lines
+
+# Ordering heuristics, from highest to lowest priority
+ORDERING_MODES = ('pv', 'tactical', 'killer', 'history', 'center')
+
+
+class MoveOrderer:
+    def __init__(self, modes=ORDERING_MODES, killers_per_ply=2):
+        """
+        Initialize a move orderer for alpha-beta search.
+
+        Moves are sorted by the enabled heuristics in priority order: principal-variation
+        move, immediate wins then blocks, killer moves of the same ply, history-heuristic
+        score, and finally the number of winning lines through the cell.
+
+        Args:
+            modes (iterable): Subset of ORDERING_MODES to apply
+            killers_per_ply (int): Number of killer moves remembered per ply
+        """
+        unknown = set(modes) - set(ORDERING_MODES)
+        if unknown:
+            raise ValueError(f"Unknown move ordering modes: {sorted(unknown)}")
+
+        self.modes = tuple(mode for mode in ORDERING_MODES if mode in modes)
+        self.label = '+'.join(self.modes) if self.modes else 'none'
+        self.killers_per_ply = killers_per_ply
+        self.killers = {}  # ply -> most recent cutoff moves at that ply
+        self.history = {}  # (mark, move) -> accumulated cutoff bonus
+
+    def order(self, board, moves, mark, ply, pv_move=None):
+        """
+        Sort moves so the ones most likely to cause a cutoff come first.
+
+        Args:
+            board: The game board
+            moves (list): Legal (row, col) moves
+            mark (str): Mark of the player to move
+            ply (int): Ply of the node (e.g. board.move_count)
+            pv_move (tuple): Best move from a previous search of this position, if known
+
+        Returns:
+            list: The moves, best candidates first
+        """
+        if not self.modes:
+            return moves
+
+        opponent = 'O' if mark == 'X' else 'X'
+        killers = self.killers.get(ply, ())
+        cell_lines = get_lines(board.size, board.win_length)[1] if 'center' in self.modes else None
+
+        def priority(move):
+            key = []
+            for mode in self.modes:
+                if mode == 'pv':
+                    key.append(move == pv_move)
+                elif mode == 'tactical':
+                    if board.is_winning_move(move[0], move[1], mark):
+                        key.append(2)
+                    elif board.is_winning_move(move[0], move[1], opponent):
+                        key.append(1)
+                    else:
+                        key.append(0)
+                elif mode == 'killer':
+                    key.append(move in killers)
+                elif mode == 'history':
+                    key.append(self.history.get((mark, move), 0))
+                else:
+                    key.append(len(cell_lines[move[0] * board.size + move[1]]))
+            return key
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def record_cutoff(self, move, mark, ply, depth):
+        """
+        Reward a move that caused a beta cutoff.
+
+        Args:
+            move (tuple): The (row, col) that caused the cutoff
+            mark (str): Mark of the player who played it
+            ply (int): Ply of the node where the cutoff happened
+            depth (int): Remaining depth at that node; deeper cutoffs earn more history
+        """
+        if 'killer' in self.modes:
+            killers = self.killers.setdefault(ply, [])
+            if move not in killers:
+                killers.insert(0, move)
+                del killers[self.killers_per_ply:]
+        if 'history' in self.modes:
+            self.history[(mark, move)] = self.history.get((mark, move), 0) + depth * depth
+
+    def new_search(self):
+        """Forget killer moves and age the history table before searching a new position."""
+        self.killers = {}
+        self.history = {key: value // 2 for key, value in self.history.items() if value > 1}
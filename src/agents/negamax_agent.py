@@ -0,0 +1,313 @@
+import random
+import time
+from agents.alphabeta_agent import SearchTimeout
+from agents.evaluation import evaluate
+from agents.move_ordering import MoveOrderer, ORDERING_MODES
+from agents.search_stats import SearchStats
+from agents.transposition_table import TranspositionTable, EXACT, LOWER_BOUND, bound_flag, entry_score
+
+
+class NegamaxAgent:
+    supports_stop_flag = True  # get_move accepts stop_flag
+
+    def __init__(self, mark, max_depth=9, use_tt=True, tt_size=65536, move_ordering='all', aspiration_window=3,
+                 time_limit=None, node_limit=None):
+        """
+        Initialize a Negamax agent with principal variation search.
+
+        The search deepens one ply at a time, opens each iteration with an aspiration
+        window around the previous score, and carries a single alpha across the root
+        moves. Scores match AlphaBetaAgent's from this agent's point of view, and the
+        same best-move set is returned.
+
+        Args:
+            mark (str): The player's mark ('X' or 'O')
+            max_depth (int): Maximum search depth
+            use_tt (bool): Whether to use a transposition table
+            tt_size (int): Number of transposition table slots
+            move_ordering: None, 'all' or a list of ORDERING_MODES
+            aspiration_window (int): Half-width of the window around the previous iteration's score
+            time_limit (float): Optional seconds per move
+            node_limit (int): Optional nodes per move
+        """
+        self.mark = mark
+        self.opponent_mark = 'O' if mark == 'X' else 'X'
+        self.max_depth = max_depth
+        self.nodes_evaluated = 0
+        self.pruned_branches = 0
+        self.stats = SearchStats()  # Per-ply counters behind each move's search report
+        self.last_tree = None  # Tree capture is not supported by this engine
+
+        self.tt = TranspositionTable(tt_size) if use_tt else None
+        if move_ordering == 'all':
+            move_ordering = ORDERING_MODES
+        self.orderer = MoveOrderer(move_ordering) if move_ordering else None
+        self.aspiration_window = aspiration_window
+
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self._deadline = None
+        self._node_budget = None
+        self._budgeted = False
+        self._stop_flag = None  # Caller's stop flag during get_move
+        self.last_search_info = None  # Depth reached and per-iteration stats of the last search
+
+    def get_move(self, board, deadline=None, stop_flag=None):
+        """
+        Choose a move for the current position.
+
+        Args:
+            board: The game board
+            deadline (float): Optional absolute time.time() by which the move must be chosen
+            stop_flag: Optional object whose truthy .value (set by another thread) ends the
+                search within 128 nodes, keeping the last completed iteration's move
+
+        Returns:
+            tuple: (row, col)
+        """
+        self.nodes_evaluated = 0
+        start_time = time.time()
+        tt_before = self.tt.get_stats() if self.tt is not None else None
+        pruned_before = self.pruned_branches
+
+        valid_moves = board.get_valid_moves()
+        if len(valid_moves) == 1:
+            return valid_moves[0]
+
+        if deadline is None and self.time_limit is not None:
+            deadline = start_time + self.time_limit
+        if self.orderer is not None:
+            self.orderer.new_search()
+        self.stats.start(board.move_count, len(valid_moves))
+
+        self.last_search_info = {'depth_reached': 0, 'iterations': []}
+        history_length = len(board.move_history)
+        ordered_moves = list(valid_moves)
+        best_moves = valid_moves
+        previous_score = None
+
+        # Searching past the end of the game cannot change the result
+        for depth in range(1, min(self.max_depth, len(valid_moves)) + 1):
+            iteration_start = time.time()
+            nodes_before = self.nodes_evaluated
+
+            # The first iteration always completes, so there is always a searched move to play
+            if depth > 1:
+                self._deadline = deadline
+                self._node_budget = self.node_limit
+                self._stop_flag = stop_flag
+                self._budgeted = deadline is not None or self.node_limit is not None or stop_flag is not None
+            try:
+                score, moves, researches = self._aspiration_search(board, ordered_moves, depth, previous_score)
+            except SearchTimeout:
+                while len(board.move_history) > history_length:
+                    board.undo_move()
+                break
+            finally:
+                self._deadline = None
+                self._node_budget = None
+                self._stop_flag = None
+                self._budgeted = False
+
+            best_moves = moves
+            previous_score = score
+            self.last_search_info['depth_reached'] = depth
+            self.last_search_info['iterations'].append({
+                'depth': depth,
+                'nodes': self.nodes_evaluated - nodes_before,
+                'time': time.time() - iteration_start,
+                'score': score,
+                'best_moves': moves,
+                'aspiration_researches': researches
+            })
+
+            # Search the previous iteration's best moves first
+            ordered_moves = moves + [move for move in ordered_moves if move not in moves]
+
+            if deadline is not None and time.time() >= deadline:
+                break
+            if stop_flag is not None and stop_flag.value:
+                break
+
+        end_time = time.time()
+
+        from utils.metrics import MetricsCollector
+        metrics = MetricsCollector()
+        metrics.record_algorithm_stats('negamax', self.nodes_evaluated, end_time - start_time)
+        metrics.record_pruned_branches('negamax', self.pruned_branches - pruned_before)
+        cache = None
+        if self.tt is not None:
+            tt_after = self.tt.get_stats()
+            cache = {key: tt_after[key] - tt_before[key] for key in ('hits', 'misses', 'stores')}
+            metrics.record_cache_stats('negamax', cache['hits'], cache['misses'], cache['stores'])
+        metrics.record_ordering_stats(
+            'negamax', self.orderer.label if self.orderer is not None else 'none',
+            self.nodes_evaluated, self.pruned_branches - pruned_before
+        )
+        metrics.record_search_report('negamax', self.stats.report(
+            board.move_count + 1, self.nodes_evaluated, end_time - start_time,
+            self.last_search_info['depth_reached'], cache
+        ))
+
+        return random.choice(best_moves)
+
+    def _aspiration_search(self, board, root_moves, depth, previous_score):
+        """
+        Search the root inside a window around the previous score, widening it on failure.
+
+        Args:
+            board: The game board
+            root_moves (list): Root moves, in the order to search them
+            depth (int): Search depth including the root move
+            previous_score (int): Score of the previous iteration, or None for a full window
+
+        Returns:
+            tuple: (best_score, best_moves, number of full-window re-searches)
+        """
+        if previous_score is None:
+            score, moves = self._search_root(board, root_moves, depth, float('-inf'), float('inf'))
+            return score, moves, 0
+
+        alpha = previous_score - self.aspiration_window
+        beta = previous_score + self.aspiration_window
+        score, moves = self._search_root(board, root_moves, depth, alpha, beta)
+        if alpha < score < beta:
+            return score, moves, 0
+
+        score, moves = self._search_root(board, root_moves, depth, float('-inf'), float('inf'))
+        return score, moves, 1
+
+    def _search_root(self, board, root_moves, depth, alpha, beta):
+        """
+        Principal variation search at the root, keeping every move that ties for best.
+
+        The first move is searched with the full window. Later moves get a null window
+        just below the best score so far and are only re-searched if they can tie or beat it.
+
+        Args:
+            board: The game board
+            root_moves (list): Root moves, in the order to search them
+            depth (int): Search depth including the root move
+            alpha (float): Lower end of the root window
+            beta (float): Upper end of the root window
+
+        Returns:
+            tuple: (best_score, best_moves); exact when alpha < best_score < beta
+        """
+        best_score = float('-inf')
+        best_moves = []
+
+        for index, move in enumerate(root_moves):
+            board.make_move(*move, self.mark)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, self.opponent_mark)
+            else:
+                # Scores are integers, so a move ties the best only if it beats best_score - 1
+                floor = max(alpha, best_score - 1)
+                score = -self.negamax(board, depth - 1, -floor - 1, -floor, self.opponent_mark)
+                if floor < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -floor, self.opponent_mark)
+            board.undo_move()
+
+            if score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+
+        return best_score, best_moves
+
+    def _check_budget(self):
+        """Raise SearchTimeout once the node budget or deadline of the current move is spent, or on a stop request."""
+        if self._node_budget is not None and self.nodes_evaluated > self._node_budget:
+            raise SearchTimeout()
+        # Reading the clock every node is measurable, so only check every 128 nodes
+        if self.nodes_evaluated & 127 == 0:
+            if self._deadline is not None and time.time() >= self._deadline:
+                raise SearchTimeout()
+            if self._stop_flag is not None and self._stop_flag.value:
+                raise SearchTimeout()
+
+    def negamax(self, board, depth, alpha, beta, mark):
+        """
+        Principal variation search from the point of view of the player to move.
+
+        Args:
+            board: The game board
+            depth (int): Remaining search depth
+            alpha (float): Lower end of the search window
+            beta (float): Upper end of the search window
+            mark (str): Mark of the player to move
+
+        Returns:
+            int: Fail-soft score for the player to move
+        """
+        self.nodes_evaluated += 1
+        ply = board.move_count - self.stats.root_move_count
+        self.stats.nodes_by_ply[ply] += 1
+        if self._budgeted:
+            self._check_budget()
+
+        # Any winner is the player who just moved
+        if board.get_winner() is not None:
+            self.stats.terminal_leaves += 1
+            return -10 - depth
+        if board.is_full():
+            self.stats.terminal_leaves += 1
+            return 0
+        if depth == 0:
+            self.stats.depth_limit_leaves += 1
+            return evaluate(board, mark)
+
+        pv_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(board.hash)
+            if entry is not None:
+                pv_move = entry[4]
+                tt_score = entry_score(entry, depth)
+                if tt_score is not None:
+                    if entry[3] == EXACT:
+                        self.stats.tt_cutoffs += 1
+                        return tt_score
+                    elif entry[3] == LOWER_BOUND:
+                        alpha = max(alpha, tt_score)
+                    else:
+                        beta = min(beta, tt_score)
+                    if alpha >= beta:
+                        self.stats.tt_cutoffs += 1
+                        return tt_score
+        alpha_searched, beta_searched = alpha, beta
+
+        moves = board.get_valid_moves()
+        if self.orderer is not None:
+            moves = self.orderer.order(board, moves, mark, board.move_count, pv_move)
+
+        opponent = 'O' if mark == 'X' else 'X'
+        best_score = float('-inf')
+        best_move = None
+        for index, move in enumerate(moves):
+            board.make_move(*move, mark)
+            if index == 0:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, opponent)
+            else:
+                # Null-window test: only re-search with the full window if the move beats alpha
+                score = -self.negamax(board, depth - 1, -alpha - 1, -alpha, opponent)
+                if alpha < score < beta:
+                    score = -self.negamax(board, depth - 1, -beta, -alpha, opponent)
+            board.undo_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self.pruned_branches += 1
+                self.stats.cutoffs_by_ply[ply] += 1
+                if self.orderer is not None:
+                    self.orderer.record_cutoff(move, mark, board.move_count, depth)
+                break
+
+        if self.tt is not None:
+            self.tt.store(board.hash, depth, best_score, bound_flag(best_score, alpha_searched, beta_searched), best_move)
+        return best_score
@@ -0,0 +1,267 @@
+import concurrent.futures
+import multiprocessing
+
+# Ways to use more than one worker: split the root moves, or search the same tree with a shared table
+PARALLEL_MODES = ('root', 'lazy_smp')
+
+# Per-worker-process state, set up by the pool initializer
+_shared_bound = None  # Best exact root score found so far for the current move
+_worker_agents = {}   # Agents are built once per worker and reused across moves (keeps their TT warm)
+_stop_flag = None     # Set by the main process when a Lazy SMP search is finished
+_helper_agents = {}   # Lazy SMP helper agents, keyed by shared table name
+
+
+def _init_worker(shared_bound):
+    global _shared_bound
+    _shared_bound = shared_bound
+
+
+def _get_worker_agent(agent_class, agent_kwargs):
+    key = (agent_class, repr(sorted(agent_kwargs.items())))
+    agent = _worker_agents.get(key)
+    if agent is None:
+        agent = agent_class(**agent_kwargs)
+        _worker_agents[key] = agent
+    return agent
+
+
+def _search_root_move(agent_class, agent_kwargs, board_class, size, move_history, move, depth, share_bound):
+    """
+    Score one root move in a worker process.
+
+    Returns:
+        tuple: (move, score, nodes_evaluated, pruned_branches)
+    """
+    board = board_class(size)
+    for row, col, mark in move_history:
+        board.make_move(row, col, mark)
+
+    agent = _get_worker_agent(agent_class, agent_kwargs)
+    agent.nodes_evaluated = 0
+    pruned_before = getattr(agent, 'pruned_branches', 0)
+
+    # Scores are integers, so searching just below the best score so far still finds every tie
+    alpha = float('-inf')
+    if share_bound:
+        alpha = _shared_bound.value - 1
+
+    score = agent.score_root_move(board, move, depth, alpha)
+
+    if share_bound and score > alpha:
+        with _shared_bound.get_lock():
+            if score > _shared_bound.value:
+                _shared_bound.value = score
+
+    return move, score, agent.nodes_evaluated, getattr(agent, 'pruned_branches', 0) - pruned_before
+
+
+def _init_helper(stop_flag):
+    global _stop_flag
+    _stop_flag = stop_flag
+
+
+def _get_helper_agent(agent_class, agent_kwargs, tt_name, tt_size, tt_replacement):
+    agent = _helper_agents.get(tt_name)
+    if agent is None:
+        from agents.transposition_table import SharedTranspositionTable
+        agent = agent_class(**agent_kwargs)
+        agent.tt = SharedTranspositionTable(tt_size, tt_replacement, name=tt_name)
+        agent._stop_flag = _stop_flag
+        _helper_agents[tt_name] = agent
+    return agent
+
+
+def _lazy_smp_helper(agent_class, agent_kwargs, tt_name, tt_size, tt_replacement, board_class, size, move_history,
+                     root_moves, depth, helper_index):
+    """
+    Search the root position in a helper process until the main search finishes.
+
+    The helper deepens iteratively up to depth with the root moves rotated by
+    helper_index, so helpers start in different subtrees and fill the shared table
+    with entries the main search can use. Only the main search picks the move.
+
+    Returns:
+        tuple: (nodes_evaluated, pruned_branches)
+    """
+    from agents.alphabeta_agent import SearchTimeout
+
+    board = board_class(size)
+    for row, col, mark in move_history:
+        board.make_move(row, col, mark)
+
+    agent = _get_helper_agent(agent_class, agent_kwargs, tt_name, tt_size, tt_replacement)
+    agent.nodes_evaluated = 0
+    pruned_before = agent.pruned_branches
+    if agent.orderer is not None:
+        agent.orderer.new_search()
+
+    shift = helper_index % len(root_moves)
+    moves = root_moves[shift:] + root_moves[:shift]
+    agent._budgeted = True
+    try:
+        for iteration_depth in range(1, depth + 1):
+            for move in moves:
+                if _stop_flag.value:
+                    raise SearchTimeout()
+                agent.score_root_move(board, move, iteration_depth)
+    except SearchTimeout:
+        while len(board.move_history) > len(move_history):
+            board.undo_move()
+    finally:
+        agent._budgeted = False
+
+    return agent.nodes_evaluated, agent.pruned_branches - pruned_before
+
+
+class RootParallelSearch:
+    def __init__(self, agent_class, agent_kwargs, workers, share_bound=True):
+        """
+        Split root moves across a process pool.
+
+        The pool is started on first use and kept until close(), so an agent pays the
+        startup cost once per game rather than once per move.
+
+        Args:
+            agent_class: Agent class rebuilt in each worker (must provide score_root_move)
+            agent_kwargs (dict): Keyword arguments for the worker agents
+            workers (int): Number of worker processes
+            share_bound (bool): Share the best root score between workers so later moves
+                are searched with a raised alpha (alpha-beta only)
+        """
+        self.agent_class = agent_class
+        self.agent_kwargs = agent_kwargs
+        self.workers = workers
+        self.share_bound = share_bound
+        self._bound = None
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._bound = multiprocessing.Value('d', float('-inf'))
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self._bound,)
+            )
+        return self._pool
+
+    def search(self, board, root_moves, depth):
+        """
+        Score every root move in parallel.
+
+        Results are merged in root_moves order, so the best-move set does not depend on
+        which worker finishes first.
+
+        Args:
+            board: The game board
+            root_moves (list): Legal root moves
+            depth (int): Search depth including the root move
+
+        Returns:
+            tuple: (best_score, best_moves, nodes_evaluated, pruned_branches)
+        """
+        pool = self._get_pool()
+        with self._bound.get_lock():
+            self._bound.value = float('-inf')
+
+        futures = [
+            pool.submit(_search_root_move, self.agent_class, self.agent_kwargs, type(board), board.size,
+                        list(board.move_history), move, depth, self.share_bound)
+            for move in root_moves
+        ]
+        results = [future.result() for future in futures]
+
+        best_score = float('-inf')
+        best_moves = []
+        nodes_evaluated = 0
+        pruned_branches = 0
+        for move, score, nodes, pruned in results:
+            nodes_evaluated += nodes
+            pruned_branches += pruned
+            if score > best_score:
+                best_score = score
+                best_moves = [move]
+            elif score == best_score:
+                best_moves.append(move)
+
+        return best_score, best_moves, nodes_evaluated, pruned_branches
+
+    def close(self):
+        """Shut down the worker pool."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class LazySMPSearch:
+    def __init__(self, agent_class, agent_kwargs, helpers, tt):
+        """
+        Run Lazy SMP helper searches alongside the main search.
+
+        Helpers search the same position as the main process and share its
+        transposition table, so the main search finds more of its subtrees already
+        scored. They are stopped as soon as the main search returns. The pool is
+        started on first use and kept until close().
+
+        Args:
+            agent_class: Agent class built in each helper (must provide score_root_move)
+            agent_kwargs (dict): Keyword arguments for the helper agents
+            helpers (int): Number of helper processes
+            tt (SharedTranspositionTable): The main search's table
+        """
+        self.agent_class = agent_class
+        self.agent_kwargs = agent_kwargs
+        self.helpers = helpers
+        self.tt = tt
+        self._stop = None
+        self._pool = None
+        self._futures = []
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._stop = multiprocessing.Value('b', 0)
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.helpers, initializer=_init_helper, initargs=(self._stop,)
+            )
+        return self._pool
+
+    def start(self, board, root_moves, depth):
+        """
+        Start the helpers on a position.
+
+        Args:
+            board: The game board
+            root_moves (list): Legal root moves
+            depth (int): Deepest iteration the helpers should search
+        """
+        pool = self._get_pool()
+        self._stop.value = 0
+        self._futures = [
+            pool.submit(_lazy_smp_helper, self.agent_class, self.agent_kwargs, self.tt.name, self.tt.max_entries,
+                        self.tt.replacement, type(board), board.size, list(board.move_history), list(root_moves),
+                        depth, index + 1)
+            for index in range(self.helpers)
+        ]
+
+    def stop(self):
+        """
+        Stop the helpers and wait for them.
+
+        Returns:
+            tuple: (nodes_evaluated, pruned_branches) summed over the helpers
+        """
+        if self._stop is not None:
+            self._stop.value = 1
+        nodes_evaluated = 0
+        pruned_branches = 0
+        for future in self._futures:
+            nodes, pruned = future.result()
+            nodes_evaluated += nodes
+            pruned_branches += pruned
+        self._futures = []
+        return nodes_evaluated, pruned_branches
+
+    def close(self):
+        """Shut down the helper pool."""
+        if self._pool is not None:
+            self.stop()
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,126 @@
+import json
+import os
+from collections import OrderedDict
+from game.symmetry import get_canonicalizer
+
+DEFAULT_PATH = "results/gemini_cache.json"
+
+_CACHES = {}
+
+
+def get_response_cache(path=None, max_entries=4096):
+    """
+    Get the process-wide response cache for a file, so every agent (and game) shares it.
+
+    Args:
+        path (str): File the cache is loaded from and saved to, or None for memory only
+        max_entries (int): Capacity used if the cache does not exist yet
+
+    Returns:
+        ResponseCache: The shared cache
+    """
+    cache = _CACHES.get(path)
+    if cache is None:
+        cache = ResponseCache(max_entries, path)
+        _CACHES[path] = cache
+    return cache
+
+
+class ResponseCache:
+    def __init__(self, max_entries=4096, path=None):
+        """
+        Initialize an LRU cache of model moves keyed by canonical position.
+
+        Positions are canonicalized over the board's symmetries, so a rotated or
+        mirrored position reuses the answer given for the original, mapped back
+        onto the real board.
+
+        Args:
+            max_entries (int): Most positions kept; the least recently used one is evicted first
+            path (str): JSON file to load entries from and save them to, or None for memory only
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.entries = OrderedDict()  # (size, canonical key, mark) -> (row, col) in the canonical frame
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def _key(self, board, mark):
+        key, transform = get_canonicalizer(board.size).canonicalize(board)
+        return (board.size, key, mark), transform
+
+    def get(self, board, mark):
+        """
+        Look up the cached move for a position.
+
+        Args:
+            board: The game board
+            mark (str): Mark of the player to move
+
+        Returns:
+            tuple or None: (row, col) on the real board, or None on a miss
+        """
+        key, transform = self._key(board, mark)
+        move = self.entries.get(key)
+        if move is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return get_canonicalizer(board.size).inverse_transform_move(move, transform)
+
+    def put(self, board, mark, move):
+        """
+        Cache the move chosen for a position.
+
+        Args:
+            board: The game board
+            mark (str): Mark of the player to move
+            move (tuple): (row, col) on the real board
+        """
+        key, transform = self._key(board, mark)
+        self.entries[key] = get_canonicalizer(board.size).transform_move(move, transform)
+        self.entries.move_to_end(key)
+        self.stores += 1
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get_stats(self):
+        """
+        Get cache statistics.
+
+        Returns:
+            dict: Hits, misses, stores and current entry count
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores, 'entries': len(self.entries)}
+
+    def load(self):
+        """Add the entries saved in self.path, least recently used first."""
+        try:
+            with open(self.path, 'r') as f:
+                rows = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        for size, key, mark, row, col in rows:
+            self.entries[(size, key, mark)] = (row, col)
+            self.entries.move_to_end((size, key, mark))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        """Write the entries to self.path, replacing the file atomically."""
+        if self.path is None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        rows = [[size, key, mark, move[0], move[1]] for (size, key, mark), move in self.entries.items()]
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(rows, f)
+        os.replace(tmp_path, self.path)
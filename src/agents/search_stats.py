@@ -0,0 +1,58 @@
+class SearchStats:
+    def __init__(self):
+        """
+        Per-move search counters, indexed by ply below the root.
+
+        The search increments the lists and counters directly (a method call per
+        node would cost more than the count), then report() turns them into a
+        per-move search report for MetricsCollector.record_search_report.
+        """
+        self.start(0, 0)
+
+    def start(self, root_move_count, max_plies):
+        """
+        Reset the counters before searching a new position.
+
+        Args:
+            root_move_count (int): board.move_count at the root
+            max_plies (int): Deepest ply the search can reach (e.g. the number of empty cells)
+        """
+        self.root_move_count = root_move_count
+        self.nodes_by_ply = [0] * (max_plies + 1)
+        self.cutoffs_by_ply = [0] * (max_plies + 1)
+        self.terminal_leaves = 0     # Won, lost or drawn positions
+        self.depth_limit_leaves = 0  # Positions scored by the static evaluation
+        self.tt_cutoffs = 0          # Nodes answered by the transposition table
+
+    def report(self, move_number, nodes_evaluated, elapsed, depth, cache=None):
+        """
+        Build the search report of one move.
+
+        Args:
+            move_number (int): Number of the move being chosen (1 for the first move of the game)
+            nodes_evaluated (int): All nodes searched for the move, including parallel workers'
+            elapsed (float): Search time in seconds
+            depth (int): Depth searched (deepest completed iteration for budgeted searches)
+            cache (dict): Transposition table hits, misses and stores for the move, if used
+
+        Returns:
+            dict: Nodes and cutoffs per ply, effective branching factor, nodes/sec, leaf
+                counts and cache stats. Per-ply counts cover the in-process search only.
+        """
+        last_ply = max((ply for ply, nodes in enumerate(self.nodes_by_ply) if nodes), default=0)
+        return {
+            'move_number': move_number,
+            'depth': depth,
+            'nodes_evaluated': nodes_evaluated,
+            'time': elapsed,
+            'nodes_per_sec': nodes_evaluated / elapsed if elapsed > 0 else 0.0,
+            # N = b**d for a uniform tree of branching factor b searched to depth d
+            'effective_branching_factor': nodes_evaluated ** (1 / depth) if depth > 0 and nodes_evaluated else 0.0,
+            'nodes_by_ply': self.nodes_by_ply[1:last_ply + 1],
+            'cutoffs_by_ply': self.cutoffs_by_ply[1:last_ply + 1],
+            'cutoffs': sum(self.cutoffs_by_ply),
+            'terminal_leaves': self.terminal_leaves,
+            'depth_limit_leaves': self.depth_limit_leaves,
+            'tt_cutoffs': self.tt_cutoffs,
+            'cache': cache
+        }
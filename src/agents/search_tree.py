@@ -0,0 +1,143 @@
+from array import array
+
+# Node flags
+PRUNED = 1         # A cutoff stopped the search of this node's children
+TERMINAL = 2       # Won, lost or drawn position
+DEPTH_LIMIT = 4    # Scored by the static evaluation
+TRANSPOSITION = 8  # Answered by the transposition table
+
+UNSCORED = -32768  # Score of a node whose search did not finish
+
+
+class SearchTree:
+    def __init__(self, size, max_depth=None, max_nodes=5000, share_transpositions=False):
+        """
+        Initialize a compact, array-backed capture of a search tree.
+
+        Nodes are rows in parallel arrays (parent index, move, ply, score, flags) rather
+        than one dict and board copy per node. Capture stops below max_depth and once
+        max_nodes nodes exist. With share_transpositions, a position reached again by
+        another move order is linked to its first node instead of being captured twice,
+        which turns the tree into a DAG.
+
+        Args:
+            size (int): Board size, used to decode moves
+            max_depth (int): Deepest ply to capture below the root (None for no limit)
+            max_nodes (int): Node budget
+            share_transpositions (bool): Link repeated positions to one node
+        """
+        self.size = size
+        self.max_depth = max_depth
+        self.max_nodes = max_nodes
+        self.share_transpositions = share_transpositions
+
+        self.parents = array('i')  # -1 for the root
+        self.moves = array('h')    # Cell index (row * size + col) of the move into the node, -1 for the root
+        self.plies = array('B')
+        self.scores = array('h')
+        self.flags = array('B')
+
+        # Extra parent -> child links of shared nodes: parallel arrays of parent, child and move
+        self.link_parents = array('i')
+        self.link_children = array('i')
+        self.link_moves = array('h')
+
+        self.truncated = False  # Set once the node budget stopped capture
+        self._positions = {}    # Position key -> node index, for sharing
+
+    def add_node(self, parent, move=None, key=None):
+        """
+        Capture a node.
+
+        Args:
+            parent (int): Index of the parent node, or None for the root
+            move (tuple): (row, col) leading from the parent to the node
+            key (int): Position key (e.g. Zobrist hash) used for sharing
+
+        Returns:
+            int or None: Index of the new node, or None if the node is not captured
+                (too deep, over budget, or linked to an existing node); searches
+                do not capture anything below a None node
+        """
+        ply = 0 if parent is None else self.plies[parent] + 1
+        if self.max_depth is not None and ply > self.max_depth:
+            return None
+
+        cell = -1 if move is None else move[0] * self.size + move[1]
+        if self.share_transpositions and key is not None:
+            shared = self._positions.get((ply, key))
+            if shared is not None:
+                self.link_parents.append(parent)
+                self.link_children.append(shared)
+                self.link_moves.append(cell)
+                return None
+
+        if len(self.parents) >= self.max_nodes:
+            self.truncated = True
+            return None
+
+        index = len(self.parents)
+        self.parents.append(-1 if parent is None else parent)
+        self.moves.append(cell)
+        self.plies.append(ply)
+        self.scores.append(UNSCORED)
+        self.flags.append(0)
+        if self.share_transpositions and key is not None:
+            self._positions[(ply, key)] = index
+        return index
+
+    def set_score(self, index, score, flags=0):
+        """
+        Record a node's search result.
+
+        Args:
+            index (int): Node index
+            score (int): Score returned for the node
+            flags (int): PRUNED, TERMINAL, DEPTH_LIMIT and/or TRANSPOSITION
+        """
+        self.scores[index] = int(score)
+        self.flags[index] |= flags
+
+    def get_move(self, index):
+        """Get the (row, col) leading into a node, or None for the root."""
+        cell = self.moves[index]
+        return None if cell < 0 else divmod(cell, self.size)
+
+    def get_children(self):
+        """
+        Get every node's children, including shared links.
+
+        Returns:
+            list: For each node index, a list of (move, child index) pairs
+        """
+        children = [[] for _ in range(len(self.parents))]
+        for index in range(1, len(self.parents)):
+            children[self.parents[index]].append((self.get_move(index), index))
+        for parent, child, cell in zip(self.link_parents, self.link_children, self.link_moves):
+            children[parent].append((divmod(cell, self.size), child))
+        return children
+
+    def to_nested(self):
+        """
+        Convert to the nested-dict form ({'score', 'pruned', 'children': {'row,col': ...}}).
+
+        Shared nodes appear as the same dict under each parent.
+
+        Returns:
+            dict: The root node, or None if the tree is empty
+        """
+        if not self.parents:
+            return None
+        nodes = []
+        for index in range(len(self.parents)):
+            node = {"children": {}, "pruned": bool(self.flags[index] & PRUNED)}
+            if self.scores[index] != UNSCORED:
+                node["score"] = self.scores[index]
+            nodes.append(node)
+        for parent, child_list in enumerate(self.get_children()):
+            for move, child in child_list:
+                nodes[parent]["children"][f"{move[0]},{move[1]}"] = nodes[child]
+        return nodes[0]
+
+    def __len__(self):
+        return len(self.parents)
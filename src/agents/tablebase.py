@@ -0,0 +1,198 @@
+import mmap
+import os
+import struct
+import sys
+
+from game.bitboard import get_win_masks
+
+MAGIC = b'TTTB'
+VERSION = 1
+SIZE = 3  # Only 3x3 is small enough to enumerate exhaustively
+
+HEADER = struct.Struct('<4sHH')  # magic, version, board size
+RECORD = struct.Struct('<hH')    # score for the side to move, bitmask of best moves
+UNREACHABLE = 0x7FFF
+
+DEFAULT_PATH = "results/tablebase_3x3.bin"
+
+_NUM_CELLS = SIZE * SIZE
+_NUM_POSITIONS = 3 ** _NUM_CELLS
+
+# Base-3 position index (empty=0, X=1, O=2) computed a byte of bits at a time
+_INDEX_TABLES = tuple(
+    tuple(sum(3 ** (chunk * 8 + bit) for bit in range(8) if (byte >> bit) & 1 and chunk * 8 + bit < _NUM_CELLS)
+          for byte in range(256))
+    for chunk in range((_NUM_CELLS + 7) // 8)
+)
+
+
+def position_index(x_bits, o_bits):
+    """
+    Get the record index of a position.
+
+    Args:
+        x_bits (int): Bitmask of X's cells
+        o_bits (int): Bitmask of O's cells
+
+    Returns:
+        int: Base-3 index of the position
+    """
+    index = 0
+    for table in _INDEX_TABLES:
+        index += table[x_bits & 0xFF] + 2 * table[o_bits & 0xFF]
+        x_bits >>= 8
+        o_bits >>= 8
+    return index
+
+
+def solve():
+    """
+    Solve every position reachable from the empty 3x3 board.
+
+    Scores are from the side to move: a win at a terminal position with e empty cells is
+    worth 10 + e, a loss -(10 + e) and a draw 0. This ranks moves exactly like a full-depth
+    MinimaxAgent/AlphaBetaAgent search (fastest win, slowest loss).
+
+    Returns:
+        list: One (score, best_move_mask) tuple per position index; unreachable positions
+            have score UNREACHABLE
+    """
+    win_masks = get_win_masks(SIZE, SIZE)
+    full_mask = (1 << _NUM_CELLS) - 1
+    records = [(UNREACHABLE, 0)] * _NUM_POSITIONS
+    solved = set()
+
+    def negamax(x_bits, o_bits):
+        index = position_index(x_bits, o_bits)
+        if index in solved:
+            return records[index][0]
+
+        x_to_move = bin(x_bits).count('1') == bin(o_bits).count('1')
+        other = o_bits if x_to_move else x_bits  # The player who just moved
+        occupied = x_bits | o_bits
+        empties = _NUM_CELLS - bin(occupied).count('1')
+
+        if any(other & mask == mask for mask in win_masks):
+            score, best_mask = -(10 + empties), 0
+        elif occupied == full_mask:
+            score, best_mask = 0, 0
+        else:
+            score, best_mask = None, 0
+            for cell in range(_NUM_CELLS):
+                bit = 1 << cell
+                if occupied & bit:
+                    continue
+                if x_to_move:
+                    child = -negamax(x_bits | bit, o_bits)
+                else:
+                    child = -negamax(x_bits, o_bits | bit)
+                if score is None or child > score:
+                    score, best_mask = child, bit
+                elif child == score:
+                    best_mask |= bit
+
+        records[index] = (score, best_mask)
+        solved.add(index)
+        return score
+
+    negamax(0, 0)
+    return records
+
+
+def build_tablebase(path=DEFAULT_PATH):
+    """
+    Solve 3x3 Tic-Tac-Toe and write the tablebase file.
+
+    The file is written to a temporary name and renamed into place, so concurrent
+    readers never see a partial file.
+
+    Args:
+        path (str): Output file path
+
+    Returns:
+        str: The path written
+    """
+    records = solve()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, SIZE))
+        for score, best_mask in records:
+            f.write(RECORD.pack(score, best_mask))
+    os.replace(tmp_path, path)
+    return path
+
+
+class Tablebase:
+    def __init__(self, path=DEFAULT_PATH):
+        """
+        Open a tablebase file as a read-only memory map.
+
+        Processes that open the same file share its pages through the OS page cache.
+
+        Args:
+            path (str): Path of a file written by build_tablebase
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, size = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or size != SIZE:
+            self.close()
+            raise ValueError(f"Not a {SIZE}x{SIZE} tablebase (version {VERSION}): {path}")
+        if len(self._map) != HEADER.size + _NUM_POSITIONS * RECORD.size:
+            self.close()
+            raise ValueError(f"Truncated tablebase file: {path}")
+
+    def lookup(self, board):
+        """
+        Look up the solved value of a position.
+
+        Args:
+            board: A 3x3 game board (Board or BitBoard)
+
+        Returns:
+            tuple or None: (score, best_moves) for the side to move, or None if the
+                position is not a reachable 3x3 position
+        """
+        if board.size != SIZE:
+            return None
+        x_bits, o_bits = board.get_bitmasks()
+        score, best_mask = RECORD.unpack_from(self._map, HEADER.size + position_index(x_bits, o_bits) * RECORD.size)
+        if score == UNREACHABLE:
+            return None
+        best_moves = [divmod(cell, SIZE) for cell in range(_NUM_CELLS) if (best_mask >> cell) & 1]
+        return score, best_moves
+
+    def close(self):
+        """Unmap the file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def load_tablebase(path=DEFAULT_PATH):
+    """
+    Open the tablebase, building it first if the file does not exist yet.
+
+    Args:
+        path (str): Tablebase file path
+
+    Returns:
+        Tablebase: The opened tablebase
+    """
+    if not os.path.exists(path):
+        build_tablebase(path)
+    return Tablebase(path)
+
+
+if __name__ == "__main__":
+    output = build_tablebase(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH)
+    print(f"✅ Tablebase written to: {output}")
@@ -0,0 +1,261 @@
+from multiprocessing import shared_memory
+
+EXACT = 0
+LOWER_BOUND = 1  # Search failed high: the true score is at least the stored score
+UPPER_BOUND = 2  # Search failed low: the true score is at most the stored score
+
+REPLACEMENT_POLICIES = ('depth', 'always')
+
+
+def bound_flag(score, alpha, beta):
+    """
+    Classify a fail-soft search result against the window it was searched with.
+
+    Args:
+        score (int): Score returned by the search
+        alpha (float): Lower end of the search window
+        beta (float): Upper end of the search window
+
+    Returns:
+        int: EXACT, LOWER_BOUND or UPPER_BOUND
+    """
+    if score <= alpha:
+        return UPPER_BOUND
+    if score >= beta:
+        return LOWER_BOUND
+    return EXACT
+
+
+def entry_score(entry, depth):
+    """
+    Translate a table entry to a score usable at the given remaining depth.
+
+    Win/loss scores encode the remaining depth (10 + depth), so entries from a deeper
+    search are only reused when exact and shifted to the current depth.
+
+    Args:
+        entry (tuple): (key, depth, score, flag, best_move) from the table
+        depth (int): Remaining search depth at the current node
+
+    Returns:
+        int or None: The usable score, or None if the entry cannot be used here
+    """
+    _, entry_depth, score, flag, _ = entry
+    if entry_depth == depth:
+        return score
+    if entry_depth < depth or flag != EXACT:
+        return None
+    if abs(score) < 10:
+        return score
+
+    # Only reuse a forced win/loss if it happens within the current horizon
+    plies = entry_depth - (abs(score) - 10)
+    if plies > depth:
+        return None
+    shift = entry_depth - depth
+    return score - shift if score > 0 else score + shift
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=65536, replacement='depth'):
+        """
+        Initialize a fixed-size transposition table.
+
+        Positions are stored in slot hash % max_entries, so memory never grows
+        past max_entries entries.
+
+        Args:
+            max_entries (int): Number of slots in the table
+            replacement (str): 'depth' keeps the entry searched deeper when two positions
+                share a slot, 'always' lets the newest entry win
+        """
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+
+        self.max_entries = max_entries
+        self.replacement = replacement
+        self.entries = [None] * max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key (int): Zobrist hash of the position
+
+        Returns:
+            tuple or None: (key, depth, score, flag, best_move) if found, None otherwise
+        """
+        entry = self.entries[key % self.max_entries]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, best_move=None):
+        """
+        Store a search result, subject to the replacement policy.
+
+        Args:
+            key (int): Zobrist hash of the position
+            depth (int): Remaining search depth the score was computed with
+            score (int): Score of the position
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND
+            best_move (tuple): Best (row, col) found, if any
+        """
+        slot = key % self.max_entries
+        entry = self.entries[slot]
+        if (entry is not None and entry[0] != key and self.replacement == 'depth'
+                and entry[1] > depth):
+            return
+        self.entries[slot] = (key, depth, score, flag, best_move)
+        self.stores += 1
+
+    def clear(self):
+        """Remove all entries and reset the counters."""
+        self.entries = [None] * self.max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get_stats(self):
+        """
+        Get the table counters.
+
+        Returns:
+            dict: Hits, misses and stores since the table was created or cleared
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores}
+
+    def __len__(self):
+        return sum(1 for entry in self.entries if entry is not None)
+
+
+# Packed entry layout for SharedTranspositionTable: two 64-bit words per slot, (key ^ data, data)
+_WORD_MASK = (1 << 64) - 1
+_OCCUPIED = 1 << 63
+_SCORE_OFFSET = 1 << 15
+
+
+def _pack_entry(depth, score, flag, best_move):
+    data = _OCCUPIED | depth | (int(score) + _SCORE_OFFSET) << 8 | flag << 24
+    if best_move is not None:
+        data |= (best_move[0] + 1) << 26 | (best_move[1] + 1) << 34
+    return data
+
+
+def _unpack_entry(key, data):
+    row = (data >> 26) & 0xFF
+    best_move = (row - 1, ((data >> 34) & 0xFF) - 1) if row else None
+    return key, data & 0xFF, ((data >> 8) & 0xFFFF) - _SCORE_OFFSET, (data >> 24) & 0x3, best_move
+
+
+class SharedTranspositionTable:
+    def __init__(self, max_entries=65536, replacement='depth', name=None):
+        """
+        Initialize a fixed-size transposition table in shared memory.
+
+        Works like TranspositionTable, but the slots live in one
+        multiprocessing.shared_memory block that several processes can probe and
+        store into at once. Each slot is two 64-bit words, (key ^ data, data); a slot
+        torn by two concurrent writers fails the key check and reads as a miss, so no
+        lock is needed. Hit/miss/store counters are per process.
+
+        Args:
+            max_entries (int): Number of slots in the table
+            replacement (str): 'depth' or 'always', as for TranspositionTable
+            name (str): Attach to the existing table with this shared memory name
+                instead of creating a new one
+        """
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+
+        self.max_entries = max_entries
+        self.replacement = replacement
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=max_entries * 16)
+        else:
+            # Pool workers share their parent's resource tracker, so attaching does not take ownership
+            self._shm = shared_memory.SharedMemory(name=name)
+        self.name = self._shm.name
+        self.words = self._shm.buf.cast('Q')  # New blocks start zeroed, i.e. empty
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Args:
+            key (int): Zobrist hash (or canonical key) of the position
+
+        Returns:
+            tuple or None: (key, depth, score, flag, best_move) if found, None otherwise
+        """
+        packed_key = (key ^ (key >> 64)) & _WORD_MASK
+        slot = (key % self.max_entries) * 2
+        check, data = self.words[slot], self.words[slot + 1]
+        if data & _OCCUPIED and check ^ data == packed_key:
+            self.hits += 1
+            return _unpack_entry(key, data)
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, score, flag, best_move=None):
+        """
+        Store a search result, subject to the replacement policy.
+
+        Args:
+            key (int): Zobrist hash (or canonical key) of the position
+            depth (int): Remaining search depth the score was computed with
+            score (int): Score of the position
+            flag (int): EXACT, LOWER_BOUND or UPPER_BOUND
+            best_move (tuple): Best (row, col) found, if any
+        """
+        packed_key = (key ^ (key >> 64)) & _WORD_MASK
+        slot = (key % self.max_entries) * 2
+        if self.replacement == 'depth':
+            check, data = self.words[slot], self.words[slot + 1]
+            if data & _OCCUPIED and check ^ data != packed_key and data & 0xFF > depth:
+                return
+        data = _pack_entry(depth, score, flag, best_move)
+        self.words[slot] = packed_key ^ data
+        self.words[slot + 1] = data
+        self.stores += 1
+
+    def clear(self):
+        """Remove all entries and reset this process's counters."""
+        self._shm.buf[:] = bytes(self.max_entries * 16)
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def get_stats(self):
+        """
+        Get this process's table counters.
+
+        Returns:
+            dict: Hits, misses and stores since the table was created or cleared
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores}
+
+    def close(self):
+        """Detach from the shared memory, freeing it if this process created it."""
+        if self._shm is None:
+            return
+        self.words.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+        self._shm = None
+
+    def __len__(self):
+        return sum(1 for slot in range(1, self.max_entries * 2, 2) if self.words[slot] & _OCCUPIED)
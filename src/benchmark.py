@@ -0,0 +1,425 @@
+import argparse
+import concurrent.futures
+import itertools
+import os
+import subprocess
+import sys
+import time
+from agents.factory import AGENT_TYPES, get_agent
+from game.game import TicTacToe
+from utils.histogram import LatencyHistogram
+from utils.metrics import MetricsCollector
+from utils.openmetrics import OpenMetricsExporter
+from utils.results_store import DEFAULT_PATH, ResultsStore, compact
+
+# The pairings of the interactive benchmark mode
+DEFAULT_PAIRINGS = [
+    ('minimax', 'minimax'),
+    ('alphabeta', 'alphabeta'),
+    ('minimax', 'alphabeta'),
+    ('minimax', 'gemini'),
+    ('alphabeta', 'gemini')
+]
+
+# Most positions sent to Gemini in one request when batching is turned on with a bare --gemini-batch
+DEFAULT_GEMINI_BATCH = 8
+
+# Optional dependencies that plain games and benchmarks must not import at startup
+HEAVY_MODULES = ('pygame', 'google.generativeai', 'dotenv', 'matplotlib', 'pandas', 'networkx')
+
+
+def play_benchmark_game(ai1, ai2, size, depth, game_index, store_path=None, run_id=None, time_limit=None):
+    """
+    Play one headless benchmark game.
+
+    The game records into its own MetricsCollector, so playing it in-process leaves
+    the caller's totals alone; its stats are returned for the caller to merge.
+
+    Args:
+        ai1 (str): Agent type playing X
+        ai2 (str): Agent type playing O
+        size (int): Board size
+        depth (int): Search depth for both agents
+        game_index (int): Number of the game within its matchup (1-based)
+        store_path (str): Results file the game's move records are appended to, if given
+        run_id (str): Run the move records belong to
+        time_limit (float): Seconds per move for the search agents, which then deepen up to depth
+
+    Returns:
+        dict: Matchup, winner ('X', 'O' or 'draw'), move count, duration and per-algorithm stats
+    """
+    with MetricsCollector.scoped() as metrics:
+        agent1 = get_agent(ai1, 'X', depth, time_limit)
+        agent2 = get_agent(ai2, 'O', depth, time_limit)
+        store = ResultsStore(store_path, run_id) if store_path else None
+        game = TicTacToe(board_size=size, agent1=agent1, agent2=agent2,
+                         view=None, metrics=metrics, tree_viz=None, quiet=True, results_store=store)
+
+        start_time = time.time()
+        winner = game.play()
+        duration = time.time() - start_time
+
+    return {
+        'game_id': game.game_id,
+        'x': ai1,
+        'o': ai2,
+        'size': size,
+        'depth': depth,
+        'time_limit': time_limit,
+        'game': game_index,
+        'winner': winner or 'draw',
+        'moves': game.board.move_count,
+        'duration': duration,
+        'algorithm_stats': {
+            algorithm: stats for algorithm, stats in metrics.to_dict().items() if stats['move_latency']['count']
+        }
+    }
+
+
+def play_batched_games(jobs, batch_size):
+    """
+    Play several headless benchmark games together, batching their Gemini moves.
+
+    Games advance in rounds: each plays its local agents' moves until it ends or a
+    Gemini agent is to move, then the waiting positions are sent to Gemini up to
+    batch_size at a time (grouped by the mark to move). Every move of a batch is
+    recorded with the batch's latency.
+
+    Args:
+        jobs (list): play_benchmark_game argument tuples
+        batch_size (int): Most positions per Gemini request
+
+    Returns:
+        list: One play_benchmark_game-style result per game, in finishing order
+    """
+    from agents.gemini_agent import GeminiAgent
+
+    # The games share one collector of their own, so playing them in-process leaves the caller's totals alone
+    with MetricsCollector.scoped() as metrics:
+        active = []
+        for ai1, ai2, size, depth, game_index, store_path, run_id, time_limit in jobs:
+            store = ResultsStore(store_path, run_id) if store_path else None
+            game = TicTacToe(board_size=size, agent1=get_agent(ai1, 'X', depth, time_limit),
+                             agent2=get_agent(ai2, 'O', depth, time_limit),
+                             view=None, metrics=metrics, tree_viz=None, quiet=True, results_store=store)
+            active.append(((ai1, ai2, size, depth, game_index, time_limit), game, time.time()))
+
+        results = []
+        while active:
+            waiting = []
+            for entry in active:
+                (ai1, ai2, size, depth, game_index, time_limit), game, start_time = entry
+                while not game.board.is_game_over():
+                    agent = game.get_current_agent()
+                    if isinstance(agent, GeminiAgent):
+                        waiting.append(entry)
+                        break
+                    move_start = time.time()
+                    move = agent.get_move(game.board)
+                    game.apply_move(agent, move, time.time() - move_start)
+                else:
+                    winner = game.finish()
+                    results.append({
+                        'game_id': game.game_id,
+                        'x': ai1,
+                        'o': ai2,
+                        'size': size,
+                        'depth': depth,
+                        'time_limit': time_limit,
+                        'game': game_index,
+                        'winner': winner or 'draw',
+                        'moves': game.board.move_count,
+                        'duration': time.time() - start_time,
+                        'algorithm_stats': _stats_from_move_records(game.move_records)
+                    })
+
+            for mark in ('X', 'O'):
+                group = [entry for entry in waiting if entry[1].current_player == mark]
+                for first in range(0, len(group), batch_size):
+                    batch = [entry[1] for entry in group[first:first + batch_size]]
+                    batch_start = time.time()
+                    moves = batch[0].get_current_agent().get_moves_batch([game.board for game in batch])
+                    batch_time = time.time() - batch_start
+                    for game, move in zip(batch, moves):
+                        game.apply_move(game.get_current_agent(), move, batch_time)
+            active = waiting
+
+        return results
+
+
+def _stats_from_move_records(move_records):
+    """
+    Build per-algorithm stats of one game from its move records.
+
+    Games played together share one MetricsCollector, so their stats are
+    rebuilt from what each game recorded itself.
+
+    Returns:
+        dict: Algorithm -> nodes_evaluated, execution_time and move_latency (to_dict() form)
+    """
+    stats = {}
+    for record in move_records:
+        entry = stats.setdefault(record['agent'], {'nodes_evaluated': 0, 'execution_time': 0.0,
+                                                   'move_latency': LatencyHistogram()})
+        entry['nodes_evaluated'] += record['nodes_evaluated']
+        entry['execution_time'] += record['move_time']
+        entry['move_latency'].record(record['move_time'])
+    for entry in stats.values():
+        entry['move_latency'] = entry['move_latency'].to_dict()
+    return stats
+
+
+def iter_benchmark(pairings, sizes, depths, games, workers=None, store=None, gemini_batch=None, time_limit=None):
+    """
+    Run every combination of pairing, size and depth, yielding each game as it finishes.
+
+    Args:
+        pairings (list): (agent type for X, agent type for O) tuples
+        sizes (list): Board sizes
+        depths (list): Search depths
+        games (int): Games per combination
+        workers (int): Worker processes; None uses every CPU, 1 plays in this process
+        store (ResultsStore): Store the workers append move records to, if given
+        gemini_batch (int): If above 1, games with a Gemini agent are played together in one
+            worker and send their Gemini moves in batches of up to this many positions. Off
+            (None) by default, since the local moves of those games then leave the pool
+        time_limit (float): Seconds per move for the search agents; depths then cap their deepening
+
+    Yields:
+        dict: One play_benchmark_game result per game, in completion order
+    """
+    store_args = (store.path, store.run_id) if store is not None else (None, None)
+    jobs = [
+        (ai1, ai2, size, depth, game_index + 1) + store_args + (time_limit,)
+        for (ai1, ai2), size, depth, game_index in itertools.product(pairings, sizes, depths, range(games))
+    ]
+
+    batched = []
+    if gemini_batch is not None and gemini_batch > 1:
+        batched = [job for job in jobs if 'gemini' in job[:2]]
+        jobs = [job for job in jobs if 'gemini' not in job[:2]]
+
+    if workers == 1:
+        for job in jobs:
+            yield play_benchmark_game(*job)
+        if batched:
+            yield from play_batched_games(batched, gemini_batch)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_benchmark_game, *job) for job in jobs]
+        if batched:
+            futures.append(pool.submit(play_batched_games, batched, gemini_batch))
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            if isinstance(result, list):
+                yield from result
+            else:
+                yield result
+
+
+def summarize(results):
+    """
+    Tally wins and average work per matchup.
+
+    Args:
+        results (list): Results from iter_benchmark
+
+    Returns:
+        dict: (x, o, size, depth) -> {'X', 'O', 'draw', 'games', 'nodes', 'duration', 'move_latency'},
+            where move_latency merges both players' move times over every game
+    """
+    summary = {}
+    for result in results:
+        key = (result['x'], result['o'], result['size'], result['depth'])
+        entry = summary.setdefault(key, {'X': 0, 'O': 0, 'draw': 0, 'games': 0, 'nodes': 0, 'duration': 0.0,
+                                         'move_latency': LatencyHistogram()})
+        entry[result['winner']] += 1
+        entry['games'] += 1
+        entry['duration'] += result['duration']
+        for stats in result['algorithm_stats'].values():
+            entry['nodes'] += stats['nodes_evaluated']
+            entry['move_latency'].merge(LatencyHistogram.from_dict(stats['move_latency']))
+    return summary
+
+
+def run_benchmark_matrix(pairings, sizes, depths, games, workers=None, output=DEFAULT_PATH, quiet=False,
+                         gemini_batch=None, time_limit=None):
+    """
+    Run a benchmark matrix, printing and saving each game as it finishes.
+
+    Each game's stats are also merged into this process's MetricsCollector, so an
+    OpenMetricsExporter running here shows the whole run as it progresses.
+
+    Args:
+        pairings (list): (agent type for X, agent type for O) tuples
+        sizes (list): Board sizes
+        depths (list): Search depths
+        games (int): Games per combination
+        workers (int): Worker processes; None uses every CPU
+        output (str): Results store file for run, game and move records; None to keep nothing
+        quiet (bool): If True, only the final summary is printed
+        gemini_batch (int): Batch Gemini moves of concurrent games, up to this many per request
+        time_limit (float): Seconds per move for the search agents, which then deepen up to each depth
+
+    Returns:
+        list: All game results, in completion order
+    """
+    total = len(pairings) * len(sizes) * len(depths) * games
+    store = None
+    if output:
+        store = ResultsStore(output)
+        store.start_run(mode='benchmark', pairings=pairings, sizes=sizes, depths=depths, games=games, workers=workers,
+                        time_limit=time_limit)
+
+    metrics = MetricsCollector()
+    results = []
+    for result in iter_benchmark(pairings, sizes, depths, games, workers, store, gemini_batch, time_limit):
+        results.append(result)
+        metrics.merge_stats(result['algorithm_stats'])
+        if store is not None:
+            store.append('game', result)
+        if not quiet:
+            outcome = "Draw" if result['winner'] == 'draw' else f"{result['winner']} wins"
+            print(f"[{len(results)}/{total}] {result['x']} (X) vs {result['o']} (O), "
+                  f"{result['size']}x{result['size']} depth {result['depth']}, game {result['game']}: "
+                  f"{outcome} in {result['duration']:.2f}s")
+
+    for (ai1, ai2, size, depth), entry in summarize(results).items():
+        latency = entry['move_latency'].summary()
+        print(f"{ai1} (X) vs {ai2} (O) on {size}x{size} at depth {depth}: "
+              f"{entry['X']} Wins | {entry['O']} Wins | {entry['draw']} Draws | "
+              f"{entry['nodes'] / entry['games']:.0f} nodes/game | {entry['duration'] / entry['games']:.2f} s/game | "
+              f"move time p50 {latency['p50']:.4f}s p99 {latency['p99']:.4f}s max {latency['max']:.4f}s")
+
+    return results
+
+
+def measure_import_time(module):
+    """
+    Import a module in a fresh interpreter under `python -X importtime`.
+
+    Args:
+        module (str): Module to import, relative to src/ (e.g. 'main')
+
+    Returns:
+        tuple: (total, direct, imported) - the module's cumulative import time in seconds,
+            {module name: cumulative seconds} of its direct imports, and every module it loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True, check=True
+    )
+    lines = result.stderr.splitlines()
+    entries = []
+    for line in lines:
+        # "import time:  self [us] | cumulative | imported package", nesting shown by indentation
+        if not line.startswith('import time:') or line.endswith('imported package'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        level = (len(name) - len(name.lstrip())) // 2
+        entries.append((level, name.strip(), int(cumulative) / 1e6))
+
+    # A package is reported after everything it imported, so its subtree is the run of deeper lines before it
+    end = max(index for index, (level, name, _) in enumerate(entries) if level == 0 and name == module)
+    start = end
+    while start > 0 and entries[start - 1][0] > 0:
+        start -= 1
+    direct = {name: seconds for level, name, seconds in entries[start:end] if level == 1}
+    imported = [name for _, name, _ in entries[start:end]]
+    return entries[end][2], direct, imported
+
+
+def check_import_time(modules=('main', 'benchmark'), top=10):
+    """
+    Print the slowest imports of each entry point and flag heavy optional dependencies.
+
+    Args:
+        modules (tuple): Entry-point modules to measure
+        top (int): Slowest direct imports to list per module
+
+    Returns:
+        bool: True if no entry point imports any of HEAVY_MODULES at startup
+    """
+    ok = True
+    for module in modules:
+        total, direct, imported = measure_import_time(module)
+        print(f"⏱️  import {module}: {total:.3f}s")
+        for name in sorted(direct, key=direct.get, reverse=True)[:top]:
+            print(f"    {direct[name]:.3f}s  {name}")
+        heavy = [name for name in HEAVY_MODULES if name in imported]
+        if heavy:
+            ok = False
+            print(f"❌ {module} imports heavy optional dependencies at startup: {', '.join(heavy)}")
+    return ok
+
+
+def parse_pairing(text):
+    """Parse an 'x_agent:o_agent' pairing argument, checking both names against AGENT_TYPES."""
+    try:
+        ai1, ai2 = text.split(':')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Pairing must look like minimax:alphabeta, got {text!r}")
+    pairing = (ai1.strip().lower(), ai2.strip().lower())
+    for name in pairing:
+        if name not in AGENT_TYPES:
+            raise argparse.ArgumentTypeError(
+                f"Unknown agent {name!r} in {text!r}; valid agents: {', '.join(AGENT_TYPES)}"
+            )
+    return pairing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Tic-Tac-Toe AI benchmarks without the interactive menu.")
+    parser.add_argument('--pairings', nargs='+', type=parse_pairing, default=DEFAULT_PAIRINGS,
+                        help="Matchups as x_agent:o_agent (default: the interactive benchmark's five pairings)")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[3], help="Board sizes (default: 3)")
+    parser.add_argument('--depths', nargs='+', type=int, default=[9], help="Search depths (default: 9)")
+    parser.add_argument('--games', type=int, default=5, help="Games per combination (default: 5)")
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help="Seconds per move for minimax, alphabeta and negamax, which then deepen "
+                             "iteratively up to --depths (default: fixed-depth search)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument('--output', default=DEFAULT_PATH,
+                        help=f"Results store (JSON Lines) the run is appended to (default: {DEFAULT_PATH})")
+    parser.add_argument('--compact', action='store_true',
+                        help="Also write the store's game records to a columnar file (Parquet or .npz)")
+    parser.add_argument('--quiet', action='store_true', help="Only print the final summary")
+    parser.add_argument('--metrics-file', help="Rewrite this file with OpenMetrics text while the run progresses")
+    parser.add_argument('--metrics-interval', type=float, default=10.0,
+                        help="Seconds between metrics file writes (default: 10)")
+    parser.add_argument('--metrics-port', type=int, help="Serve OpenMetrics text on http://127.0.0.1:PORT/metrics")
+    parser.add_argument('--gemini-batch', type=int, nargs='?', const=DEFAULT_GEMINI_BATCH, metavar='N',
+                        help=f"Play the Gemini games together in one worker, sending up to N of their positions "
+                             f"per request (N defaults to {DEFAULT_GEMINI_BATCH}). Off by default: the local "
+                             f"moves of those games then run outside the process pool")
+    parser.add_argument('--import-time', action='store_true',
+                        help="Only report startup import times and fail if heavy optional dependencies load")
+    args = parser.parse_args()
+
+    if args.import_time:
+        sys.exit(0 if check_import_time() else 1)
+
+    if any(agent == 'human' for pairing in args.pairings for agent in pairing):
+        parser.error("Human agents cannot play headless benchmarks")
+
+    print(f"\n🏆 Running {len(args.pairings) * len(args.sizes) * len(args.depths) * args.games} benchmark games...")
+    exporter = None
+    if args.metrics_file or args.metrics_port is not None:
+        exporter = OpenMetricsExporter(path=args.metrics_file, interval=args.metrics_interval,
+                                       port=args.metrics_port).start()
+        if args.metrics_port is not None:
+            print(f"📈 Serving metrics on http://127.0.0.1:{exporter.port}/metrics")
+    try:
+        run_benchmark_matrix(args.pairings, args.sizes, args.depths, args.games, args.workers, args.output,
+                             args.quiet, args.gemini_batch, args.time_limit)
+    finally:
+        if exporter is not None:
+            exporter.stop()
+    print(f"\n📊 Benchmark complete. Results saved to: {args.output}")
+    if args.compact:
+        print(f"✅ Columnar results written to: {compact(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
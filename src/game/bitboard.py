@@ -0,0 +1,271 @@
+import numpy as np
+from game.board import get_lines
+from game.zobrist import get_zobrist_keys
+
+# Win-line masks are shared by every board of the same shape, so they are built once per (size, win_length)
+_WIN_MASKS = {}
+_CELL_WIN_MASKS = {}
+
+
+def get_win_masks(size, win_length):
+    """
+    Get the precomputed win-line masks for a board shape.
+
+    Each mask has one bit set per cell of a winning line, where cell (row, col)
+    maps to bit row * size + col.
+
+    Args:
+        size (int): The size of the board
+        win_length (int): Number of marks in a row needed to win
+
+    Returns:
+        tuple: Tuple of int bitmasks, one per winning line
+    """
+    key = (size, win_length)
+    masks = _WIN_MASKS.get(key)
+    if masks is None:
+        lines, _ = get_lines(size, win_length)
+        masks = tuple(sum(1 << cell for cell in line) for line in lines)
+        _WIN_MASKS[key] = masks
+    return masks
+
+
+def get_cell_win_masks(size, win_length):
+    """
+    Get the win-line masks passing through each cell.
+
+    Args:
+        size (int): The size of the board
+        win_length (int): Number of marks in a row needed to win
+
+    Returns:
+        tuple: One tuple of int bitmasks per flat cell index
+    """
+    key = (size, win_length)
+    cell_masks = _CELL_WIN_MASKS.get(key)
+    if cell_masks is None:
+        masks = get_win_masks(size, win_length)
+        _, cell_lines = get_lines(size, win_length)
+        cell_masks = tuple(tuple(masks[line] for line in lines) for lines in cell_lines)
+        _CELL_WIN_MASKS[key] = cell_masks
+    return cell_masks
+
+
+class BitBoard:
+    def __init__(self, size=3):
+        """
+        Initialize a Tic-Tac-Toe board backed by one integer bitmask per player.
+
+        Exposes the same public API as Board, so agents can use either one.
+
+        Args:
+            size (int): The size of the board (default: 3 for 3x3)
+        """
+        self.size = size
+        self.win_length = 3 if size == 3 else 5  # Same win condition as Board
+        self.win_masks = get_win_masks(size, self.win_length)
+        self.cell_win_masks = get_cell_win_masks(size, self.win_length)
+        self.full_mask = (1 << (size * size)) - 1
+
+        self.x_bits = 0
+        self.o_bits = 0
+
+        # Zobrist hash of the position, updated incrementally on every move and undo
+        self.zobrist_keys = get_zobrist_keys(size)
+        self.hash = 0
+
+        # Track move history for visualization purposes
+        self.move_history = []
+        self.move_count = 0  # Track number of moves to determine the current player
+
+    def _bits_for(self, mark):
+        return self.x_bits if mark == 'X' else self.o_bits
+
+    def make_move(self, row, col, mark):
+        """
+        Make a move on the board.
+
+        Args:
+            row (int): Row index
+            col (int): Column index
+            mark (str): Player's mark ('X' or 'O')
+
+        Returns:
+            bool: True if the move was valid, False otherwise
+        """
+        if not self.is_valid_move(row, col):
+            return False
+
+        bit = 1 << (row * self.size + col)
+        if mark == 'X':
+            self.x_bits |= bit
+        else:
+            self.o_bits |= bit
+        self.move_history.append((row, col, mark))
+        self.move_count += 1
+        self.hash ^= self.zobrist_keys[mark][row * self.size + col]
+        return True
+
+    def undo_move(self):
+        """
+        Undo the most recent move, restoring the cell, move history and move count.
+
+        Returns:
+            tuple or None: The (row, col, mark) that was undone, or None if there were no moves
+        """
+        if not self.move_history:
+            return None
+
+        row, col, mark = self.move_history.pop()
+        bit = 1 << (row * self.size + col)
+        if mark == 'X':
+            self.x_bits &= ~bit
+        else:
+            self.o_bits &= ~bit
+        self.move_count -= 1
+        self.hash ^= self.zobrist_keys[mark][row * self.size + col]
+        return (row, col, mark)
+
+    def is_valid_move(self, row, col):
+        """
+        Check if a move is valid.
+
+        Args:
+            row (int): Row index
+            col (int): Column index
+
+        Returns:
+            bool: True if the move is valid, False otherwise
+        """
+        if not (0 <= row < self.size and 0 <= col < self.size):
+            return False
+        return not ((self.x_bits | self.o_bits) >> (row * self.size + col)) & 1
+
+    def get_valid_moves(self):
+        """
+        Get all valid moves on the board.
+
+        Returns:
+            list: List of (row, col) tuples representing valid moves, in row-major order
+        """
+        occupied = self.x_bits | self.o_bits
+        size = self.size
+        return [divmod(i, size) for i in range(size * size) if not (occupied >> i) & 1]
+
+    def is_winning_move(self, row, col, mark):
+        """
+        Check if placing a mark on an empty cell would complete a line.
+
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            mark (str): Player's mark ('X' or 'O')
+
+        Returns:
+            bool: True if the move wins the game for that player
+        """
+        cell = row * self.size + col
+        bits = self._bits_for(mark) | (1 << cell)
+        for mask in self.cell_win_masks[cell]:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def is_full(self):
+        """
+        Check if the board is full.
+
+        Returns:
+            bool: True if the board is full, False otherwise
+        """
+        return (self.x_bits | self.o_bits) == self.full_mask
+
+    def check_win(self, mark):
+        """
+        Check if a player has won.
+
+        Args:
+            mark (str): Player's mark ('X' or 'O')
+
+        Returns:
+            bool: True if the player has won, False otherwise
+        """
+        bits = self._bits_for(mark)
+        for mask in self.win_masks:
+            if bits & mask == mask:
+                return True
+        return False
+
+    def get_winner(self):
+        """
+        Get the winner of the game, if any.
+
+        Returns:
+            str or None: 'X' if X has won, 'O' if O has won, None if there's no winner
+        """
+        if self.check_win('X'):
+            return 'X'
+        elif self.check_win('O'):
+            return 'O'
+        else:
+            return None
+
+    def is_game_over(self):
+        """
+        Check if the game is over (either a player has won or the board is full).
+
+        Returns:
+            bool: True if the game is over, False otherwise
+        """
+        return self.get_winner() is not None or self.is_full()
+
+    def get_state(self):
+        """
+        Get the current state of the board.
+
+        Returns:
+            numpy.ndarray: The board state, in the same format as Board.get_state
+        """
+        cells = np.full(self.size * self.size, ' ')
+        for i in range(self.size * self.size):
+            if (self.x_bits >> i) & 1:
+                cells[i] = 'X'
+            elif (self.o_bits >> i) & 1:
+                cells[i] = 'O'
+        return cells.reshape(self.size, self.size)
+
+    def get_bitmasks(self):
+        """
+        Get the position as one bitmask per player, with bit row * size + col set for each occupied cell.
+
+        Returns:
+            tuple: (x_bits, o_bits)
+        """
+        return self.x_bits, self.o_bits
+
+    def get_current_player(self):
+        """
+        Determine the current player based on move count.
+
+        Returns:
+            str: 'X' or 'O' depending on the turn.
+        """
+        return 'X' if self.move_count % 2 == 0 else 'O'
+
+    def __str__(self):
+        """
+        String representation of the board.
+
+        Returns:
+            str: String representation of the board
+        """
+        state = self.get_state()
+        s = ""
+        for row in range(self.size):
+            s += "|"
+            for col in range(self.size):
+                s += f" {state[row, col]} |"
+            s += "\n"
+            if row < self.size - 1:
+                s += "-" * (self.size * 4 + 1) + "\n"
+        return s
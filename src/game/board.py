@@ -1,4 +1,43 @@
 import numpy as np
+from game.zobrist import get_zobrist_keys
+
+# Winning lines are shared by every board of the same shape, so they are built once per (size, win_length)
+_LINES = {}
+
+
+def get_lines(size, win_length):
+    """
+    Get the precomputed winning lines for a board shape.
+
+    Args:
+        size (int): The size of the board
+        win_length (int): Number of marks in a row needed to win
+
+    Returns:
+        tuple: (lines, cell_lines) where lines is a tuple of winning lines, each a tuple of
+            flat cell indices (row * size + col), and cell_lines maps each flat cell index
+            to the tuple of line indices passing through it
+    """
+    key = (size, win_length)
+    if key not in _LINES:
+        lines = []
+        # Right, down, down-right and up-right cover every line exactly once
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                    end_row = row + d_row * (win_length - 1)
+                    end_col = col + d_col * (win_length - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        lines.append(tuple((row + d_row * i) * size + col + d_col * i for i in range(win_length)))
+
+        cell_lines = [[] for _ in range(size * size)]
+        for index, line in enumerate(lines):
+            for cell in line:
+                cell_lines[cell].append(index)
+
+        _LINES[key] = (tuple(lines), tuple(tuple(indices) for indices in cell_lines))
+    return _LINES[key]
+
 
 class Board:
     def __init__(self, size=3):
@@ -16,6 +55,18 @@ class Board:
         self.move_history = []
         self.move_count = 0  # Track number of moves to determine the current player
 
+        # Per-line occupancy counters, updated incrementally so win checks only touch the lines through the last move
+        self.lines, self.cell_lines = get_lines(size, self.win_length)
+        self.line_counts = {'X': [0] * len(self.lines), 'O': [0] * len(self.lines)}
+        self.completed_lines = {'X': 0, 'O': 0}
+
+        # Zobrist hash of the position, updated incrementally on every move and undo
+        self.zobrist_keys = get_zobrist_keys(size)
+        self.hash = 0
+
+        # One bitmask per player, for symmetry canonicalization and other bitwise consumers
+        self.mark_bits = {'X': 0, 'O': 0}
+
     def make_move(self, row, col, mark):
         """
         Make a move on the board.
@@ -34,8 +85,39 @@ class Board:
         self.board[row, col] = mark
         self.move_history.append((row, col, mark))
         self.move_count += 1  # Increment move count
+        self.hash ^= self.zobrist_keys[mark][row * self.size + col]
+        self.mark_bits[mark] |= 1 << (row * self.size + col)
+
+        counts = self.line_counts[mark]
+        for line in self.cell_lines[row * self.size + col]:
+            counts[line] += 1
+            if counts[line] == self.win_length:
+                self.completed_lines[mark] += 1
         return True
 
+    def undo_move(self):
+        """
+        Undo the most recent move, restoring the cell, move history and move count.
+
+        Returns:
+            tuple or None: The (row, col, mark) that was undone, or None if there were no moves
+        """
+        if not self.move_history:
+            return None
+
+        row, col, mark = self.move_history.pop()
+        self.board[row, col] = ' '
+        self.move_count -= 1
+        self.hash ^= self.zobrist_keys[mark][row * self.size + col]
+        self.mark_bits[mark] &= ~(1 << (row * self.size + col))
+
+        counts = self.line_counts[mark]
+        for line in self.cell_lines[row * self.size + col]:
+            if counts[line] == self.win_length:
+                self.completed_lines[mark] -= 1
+            counts[line] -= 1
+        return (row, col, mark)
+
     def is_valid_move(self, row, col):
         """
         Check if a move is valid.
@@ -58,6 +140,24 @@ class Board:
         """
         return [(row, col) for row in range(self.size) for col in range(self.size) if self.is_valid_move(row, col)]
 
+    def is_winning_move(self, row, col, mark):
+        """
+        Check if placing a mark on an empty cell would complete a line.
+        
+        Args:
+            row (int): Row index of an empty cell
+            col (int): Column index of an empty cell
+            mark (str): Player's mark ('X' or 'O')
+            
+        Returns:
+            bool: True if the move wins the game for that player
+        """
+        counts = self.line_counts[mark]
+        for line in self.cell_lines[row * self.size + col]:
+            if counts[line] == self.win_length - 1:
+                return True
+        return False
+
     def is_full(self):
         """
         Check if the board is full.
@@ -65,7 +165,7 @@ class Board:
         Returns:
             bool: True if the board is full, False otherwise
         """
-        return len(self.get_valid_moves()) == 0
+        return self.move_count == self.size * self.size
 
     def check_win(self, mark):
         """
@@ -77,32 +177,7 @@ class Board:
         Returns:
             bool: True if the player has won, False otherwise
         """
-        # print (f"Checking win for {mark}")
-        # Check rows
-        for row in range(self.size):
-            for col in range(self.size - self.win_length + 1):
-                if all(self.board[row, col+i] == mark for i in range(self.win_length)):
-                    return True
-
-        # Check columns
-        for col in range(self.size):
-            for row in range(self.size - self.win_length + 1):
-                if all(self.board[row+i, col] == mark for i in range(self.win_length)):
-                    return True
-
-        # Check diagonals (down-right)
-        for row in range(self.size - self.win_length + 1):
-            for col in range(self.size - self.win_length + 1):
-                if all(self.board[row+i, col+i] == mark for i in range(self.win_length)):
-                    return True
-
-        # Check diagonals (up-right)
-        for row in range(self.win_length - 1, self.size):
-            for col in range(self.size - self.win_length + 1):
-                if all(self.board[row-i, col+i] == mark for i in range(self.win_length)):
-                    return True
-
-        return False
+        return self.completed_lines[mark] > 0
 
     def get_winner(self):
         """
@@ -136,6 +211,15 @@ class Board:
         """
         return self.board.copy()
 
+    def get_bitmasks(self):
+        """
+        Get the position as one bitmask per player, with bit row * size + col set for each occupied cell.
+
+        Returns:
+            tuple: (x_bits, o_bits)
+        """
+        return self.mark_bits['X'], self.mark_bits['O']
+
     def get_current_player(self):
         """
         Determine the current player based on move count.
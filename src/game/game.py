@@ -1,8 +1,10 @@
 import time
+import uuid
 from game.board import Board
 
 class TicTacToe:
-    def __init__(self, board_size=3, agent1=None, agent2=None, view=None, metrics=None, tree_viz=None, quiet=False):
+    def __init__(self, board_size=3, agent1=None, agent2=None, view=None, metrics=None, tree_viz=None, quiet=False, board_cls=Board,
+                 results_store=None):
         """
         Initialize the Tic-Tac-Toe game.
         
@@ -14,14 +16,19 @@ class TicTacToe:
             metrics: Metrics collector
             tree_viz: Tree visualizer (optional)
             quiet (bool): If True, minimal output will be shown
+            board_cls: Board implementation to use (Board or BitBoard)
+            results_store: Optional ResultsStore that receives one 'move' record per AI move
         """
-        self.board = Board(board_size)
+        self.board = board_cls(board_size)
         self.agent1 = agent1  # AI or human for X
         self.agent2 = agent2  # AI or human for O
         self.view = view
         self.metrics = metrics
         self.tree_viz = tree_viz
         self.quiet = quiet
+        self.results_store = results_store
+        self.game_id = uuid.uuid4().hex[:12]  # Links this game's move records to its game record
+        self.move_records = []
         
         # Track current player as 'X' or 'O'
         self.current_player = 'X'
@@ -54,40 +61,97 @@ class TicTacToe:
             current_agent = self.get_current_agent()
 
             if current_agent is not None:  # AI Turn
-                print(f"({self.current_player})'s turn...") #to help debug
+                if not self.quiet:
+                    print(f"({self.current_player})'s turn...") #to help debug
                 start_time = time.time()
-                move = current_agent.get_move(self.board)
+                # Capture search trees only when something will draw them
+                if self.tree_viz is not None and getattr(current_agent, 'supports_tree_capture', False):
+                    move = current_agent.get_move(self.board, capture_tree=True)
+                else:
+                    move = current_agent.get_move(self.board)
                 end_time = time.time()
+                if move:
+                    self.apply_move(current_agent, move, end_time - start_time)
+            # Human turns are handled in the GUI
 
-                # Log AI move execution time
-                if self.metrics:
-                    agent_type = current_agent.__class__.__name__.lower().replace('agent', '')
-                    self.metrics.record_move_time(agent_type, end_time - start_time)
-            else:  #  Human turn (handled in GUI)
-                move = None  # Let GUI handle human input
-
-            # If AI made a move, validate and update board
-            if move:
-                row, col = move
-                if not self.board.make_move(row, col, self.current_player):
-                    if not self.quiet:
-                        print(f"Invalid move by {self.current_player}!")
-                    continue  # Skip to next iteration if invalid
-            
-                # Update the GUI or console view
-                if not self.quiet:
-                    self.view.display_board(self.board)
-                    self.view.display_move(self.current_player, row, col)
+        return self.finish()
+
+    def apply_move(self, agent, move, move_time):
+        """
+        Play an AI move for the current player and record it if it is legal.
+
+        Args:
+            agent: The agent that chose the move
+            move (tuple): (row, col)
+            move_time (float): Seconds the agent took to choose it
+
+        Returns:
+            bool: True if the move was legal and played
+        """
+        # Validate and update board; rejected moves leave no metrics or move record behind
+        row, col = move
+        if not self.board.make_move(row, col, self.current_player):
+            if not self.quiet:
+                print(f"Invalid move by {self.current_player}!")
+            return False
+
+        # Log AI move execution time
+        agent_type = agent.__class__.__name__.lower().replace('agent', '')
+        if self.metrics:
+            self.metrics.record_move_time(agent_type, move_time)
+        self.move_records.append({
+            'game_id': self.game_id,
+            'move_number': self.board.move_count,
+            'player': self.current_player,
+            'agent': agent_type,
+            'row': row,
+            'col': col,
+            'move_time': move_time,
+            'nodes_evaluated': getattr(agent, 'nodes_evaluated', 0)
+        })
+
+        # Update the GUI or console view
+        if not self.quiet:
+            self.view.display_board(self.board)
+            self.view.display_move(self.current_player, row, col)
+
+        # Switch to the next player
+        self.switch_player()
+        return True
+
+    def undo_move(self):
+        """Take back the last move along with its move record, and give the turn back."""
+        self.board.undo_move()
+        if self.move_records:
+            self.move_records.pop()
+        self.switch_player()
+
+    def finish(self, announce=True):
+        """
+        Save the move records, release agent resources and announce the result.
+
+        Args:
+            announce (bool): Show the result on the view; False when the game ended
+                some other way, such as a resignation
+
+        Returns:
+            str or None: The mark of the winner ('X' or 'O'), or None for a draw
+        """
+        # Write the moves in one batch so concurrent games do not contend per move
+        if self.results_store is not None:
+            self.results_store.append_many('move', self.move_records)
+
+        # Release per-game agent resources such as search worker pools
+        for agent in (self.agent1, self.agent2):
+            if hasattr(agent, 'close'):
+                agent.close()
 
-                # Switch to the next player
-                self.switch_player()
-        
         #  Determine winner and display result
         winner = self.board.get_winner()
-        if not self.quiet:
+        if announce and not self.quiet:
             if winner:
                 self.view.display_winner(winner)
             else:
                 self.view.display_draw()
         
-        return winner
\ No newline at end of file
+        return winner
@@ -0,0 +1,154 @@
+# The eight symmetries of a square board (dihedral group D4), as (row, col) -> (row, col) maps for the last index n
+TRANSFORMS = (
+    lambda r, c, n: (r, c),          # identity
+    lambda r, c, n: (c, n - r),      # rotate 90 degrees clockwise
+    lambda r, c, n: (n - r, n - c),  # rotate 180 degrees
+    lambda r, c, n: (n - c, r),      # rotate 270 degrees clockwise
+    lambda r, c, n: (r, n - c),      # mirror left-right
+    lambda r, c, n: (n - r, c),      # mirror top-bottom
+    lambda r, c, n: (c, r),          # reflect on the main diagonal
+    lambda r, c, n: (n - c, n - r),  # reflect on the anti-diagonal
+)
+
+# Bits are permuted a byte at a time through lookup tables
+_CHUNK_BITS = 8
+
+_CANONICALIZERS = {}
+
+
+def get_canonicalizer(size):
+    """
+    Get the shared canonicalizer for a board size.
+
+    Args:
+        size (int): The size of the board
+
+    Returns:
+        SymmetryCanonicalizer: Canonicalizer with precomputed tables for that size
+    """
+    canonicalizer = _CANONICALIZERS.get(size)
+    if canonicalizer is None:
+        canonicalizer = SymmetryCanonicalizer(size)
+        _CANONICALIZERS[size] = canonicalizer
+    return canonicalizer
+
+
+class SymmetryCanonicalizer:
+    def __init__(self, size):
+        """
+        Precompute the cell and bit permutations for every symmetry of a square board.
+
+        Args:
+            size (int): The size of the board
+        """
+        self.size = size
+        self.num_cells = size * size
+
+        # permutations[t][cell] is where transform t sends a flat cell index
+        self.permutations = []
+        self.inverse_permutations = []
+        for transform in TRANSFORMS:
+            permutation = [0] * self.num_cells
+            for cell in range(self.num_cells):
+                row, col = transform(cell // size, cell % size, size - 1)
+                permutation[cell] = row * size + col
+            inverse = [0] * self.num_cells
+            for cell, target in enumerate(permutation):
+                inverse[target] = cell
+            self.permutations.append(tuple(permutation))
+            self.inverse_permutations.append(tuple(inverse))
+
+        # chunk_tables[t][j][byte] is the permuted mask of the bits `byte` at chunk j
+        num_chunks = (self.num_cells + _CHUNK_BITS - 1) // _CHUNK_BITS
+        self.chunk_tables = []
+        for permutation in self.permutations:
+            tables = []
+            for chunk in range(num_chunks):
+                table = []
+                for byte in range(1 << _CHUNK_BITS):
+                    mask = 0
+                    for bit in range(_CHUNK_BITS):
+                        cell = chunk * _CHUNK_BITS + bit
+                        if (byte >> bit) & 1 and cell < self.num_cells:
+                            mask |= 1 << permutation[cell]
+                    table.append(mask)
+                tables.append(tuple(table))
+            self.chunk_tables.append(tuple(tables))
+
+    def transform_bits(self, bits, transform):
+        """
+        Apply a symmetry to a cell bitmask.
+
+        Args:
+            bits (int): Bitmask with bit row * size + col set for each occupied cell
+            transform (int): Index into TRANSFORMS
+
+        Returns:
+            int: The transformed bitmask
+        """
+        result = 0
+        for table in self.chunk_tables[transform]:
+            result |= table[bits & 0xFF]
+            bits >>= _CHUNK_BITS
+        return result
+
+    def canonicalize_bits(self, x_bits, o_bits):
+        """
+        Find the canonical form of a position given as player bitmasks.
+
+        Args:
+            x_bits (int): Bitmask of X's cells
+            o_bits (int): Bitmask of O's cells
+
+        Returns:
+            tuple: (key, transform) where key is the smallest x | o << size*size over all
+                symmetries, and transform is the index that maps the position onto it
+        """
+        best_key = None
+        best_transform = 0
+        shift = self.num_cells
+        for transform in range(len(TRANSFORMS)):
+            key = self.transform_bits(x_bits, transform) | (self.transform_bits(o_bits, transform) << shift)
+            if best_key is None or key < best_key:
+                best_key = key
+                best_transform = transform
+        return best_key, best_transform
+
+    def canonicalize(self, board):
+        """
+        Find the canonical form of a board.
+
+        Args:
+            board: The game board (Board or BitBoard)
+
+        Returns:
+            tuple: (key, transform), see canonicalize_bits
+        """
+        x_bits, o_bits = board.get_bitmasks()
+        return self.canonicalize_bits(x_bits, o_bits)
+
+    def transform_move(self, move, transform):
+        """
+        Map a real move into the frame of a transform (e.g. into the canonical position).
+
+        Args:
+            move (tuple): (row, col) on the real board
+            transform (int): Index into TRANSFORMS
+
+        Returns:
+            tuple: (row, col) in the transformed frame
+        """
+        return divmod(self.permutations[transform][move[0] * self.size + move[1]], self.size)
+
+    def inverse_transform_move(self, move, transform):
+        """
+        Map a move from the frame of a transform (e.g. the canonical position) back to the real board.
+
+        Args:
+            move (tuple): (row, col) in the transformed frame
+            transform (int): Index into TRANSFORMS
+
+        Returns:
+            tuple: (row, col) on the real board
+        """
+        return divmod(self.inverse_permutations[transform][move[0] * self.size + move[1]], self.size)
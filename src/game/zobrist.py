@@ -0,0 +1,22 @@
+import random
+
+# Keys are seeded per board size so every process (and every run) hashes positions identically
+_ZOBRIST_KEYS = {}
+
+
+def get_zobrist_keys(size):
+    """
+    Get the Zobrist keys for a board size.
+
+    Args:
+        size (int): The size of the board
+
+    Returns:
+        dict: Maps 'X' and 'O' to a tuple of 64-bit keys, one per flat cell index (row * size + col)
+    """
+    keys = _ZOBRIST_KEYS.get(size)
+    if keys is None:
+        rng = random.Random(size)
+        keys = {mark: tuple(rng.getrandbits(64) for _ in range(size * size)) for mark in ('X', 'O')}
+        _ZOBRIST_KEYS[size] = keys
+    return keys
@@ -1,31 +1,20 @@
-import time
-import pygame
 import sys
 from game.game import TicTacToe
 from agents.human_agent import HumanAgent
 from agents.minimax_agent import MinimaxAgent
 from agents.alphabeta_agent import AlphaBetaAgent
-from agents.gemini_agent import GeminiAgent
+from agents.factory import get_agent
+from benchmark import DEFAULT_PAIRINGS, run_benchmark_matrix
 from utils.logger import Logger
 from utils.metrics import MetricsCollector
+from utils.results_store import DEFAULT_PATH as RESULTS_PATH, ResultsStore
 from visualization.console_view import ConsoleView
-from visualization.gui_view import GUIView
-from visualization.tree_visualizer import TreeVisualizer
-
-def get_agent(agent_type, mark, depth=9):
-    """Returns the appropriate agent based on the selected type."""
-    if agent_type == 'human':
-        return HumanAgent(mark)
-    elif agent_type == 'minimax':
-        return MinimaxAgent(mark, depth)
-    elif agent_type == 'alphabeta':
-        return AlphaBetaAgent(mark, depth)
-    elif agent_type == 'gemini':
-        return GeminiAgent(mark)
-    else:
-        raise ValueError(f"Unknown agent type: {agent_type}")
 
-# (imports remain unchanged)
+# Seconds per move in 5x5 benchmarks
+BENCHMARK_TIME_LIMIT = 1.0
+
+# pygame, the Gemini client and matplotlib are imported where they are first needed,
+# so console games and benchmarks start without them
 
 def main():
     print("\n🎮 Welcome to Tic-Tac-Toe with AI! 🎮")
@@ -56,7 +45,7 @@ def main():
         depth = int(input("\nEnter AI search depth (default: 9): "))
 
     # Logger and Metrics
-    logger = Logger("game_log.txt")
+    logger = Logger("game_log.txt", buffered=True)
     metrics = MetricsCollector()
 
     # Visualization Setup
@@ -64,11 +53,16 @@ def main():
         view = ConsoleView()
     else:
         print("Launching Pygame GUI...")
+        import pygame
+        from visualization.gui_view import GUIView
         pygame.init()
         game_stub = TicTacToe(board_size=size)
         view = GUIView(game_stub)
 
-    tree_viz = TreeVisualizer() if mode in [1, 2, 4, 5] else None
+    tree_viz = None
+    if mode in [1, 2, 4, 5]:
+        from visualization.tree_visualizer import TreeVisualizer
+        tree_viz = TreeVisualizer()
 
     # Agent Configuration
     if mode == 1:
@@ -79,17 +73,17 @@ def main():
         agent2 = AlphaBetaAgent('O', depth)
     elif mode == 3:
         agent1 = HumanAgent('X')
-        agent2 = GeminiAgent('O')
+        agent2 = get_agent('gemini', 'O')
     elif mode == 4:
         agent1 = MinimaxAgent('X', depth)
         agent2 = AlphaBetaAgent('O', depth)
     elif mode == 5:
-        valid_choices = ['minimax', 'alphabeta', 'gemini']
-        player1 = input("\nSelect AI for Player 1 (X) [minimax / alphabeta / gemini]: ").strip().lower()
+        valid_choices = ['minimax', 'alphabeta', 'negamax', 'gemini']
+        player1 = input("\nSelect AI for Player 1 (X) [minimax / alphabeta / negamax / gemini]: ").strip().lower()
         while player1 not in valid_choices:
             print("❌ Invalid choice!")
             player1 = input("Select AI for Player 1 (X): ").strip().lower()
-        player2 = input("\nSelect AI for Player 2 (O) [minimax / alphabeta / gemini]: ").strip().lower()
+        player2 = input("\nSelect AI for Player 2 (O) [minimax / alphabeta / negamax / gemini]: ").strip().lower()
         while player2 not in valid_choices:
             print("❌ Invalid choice!")
             player2 = input("Select AI for Player 2 (O): ").strip().lower()
@@ -99,34 +93,48 @@ def main():
         run_benchmark(size, depth, logger, metrics)
         return
 
-    game = TicTacToe(board_size=size, agent1=agent1, agent2=agent2,
-                     view=view, metrics=metrics, tree_viz=tree_viz)
+    # Every game of every run is appended to one results file, tagged with this run's metadata
+    store = ResultsStore()
+    store.start_run(mode=mode, size=size, depth=depth, viz=viz)
 
-    if viz == 'gui':
-        view.game = game
-        view.run_main_loop()
-    else:
-        winner = game.play()
+    game = TicTacToe(board_size=size, agent1=agent1, agent2=agent2,
+                     view=view, metrics=metrics, tree_viz=tree_viz, results_store=store)
 
+    def save_game(winner):
         if winner is None:
             logger.log("Game ended in a draw")
         else:
             logger.log(f"Winner: {winner}")
 
-        metrics.save_to_file(f"results/metrics/game_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        metrics.save_to_store(
+            store, game_id=game.game_id, x=type(agent1).__name__, o=type(agent2).__name__,
+            size=size, depth=depth, winner=winner or 'draw', moves=game.board.move_count
+        )
+
+    if viz == 'gui':
+        # The GUI plays moves through game.apply_move and finishes the game itself
+        view.game = game
+        view.on_finish = save_game
+        view.run_main_loop()
+    else:
+        winner = game.play()
+        save_game(winner)
 
         print("\n📊 Game Statistics:")
         print(f"Total nodes evaluated by Minimax: {metrics.get_nodes_evaluated('minimax')}")
         print(f"Total nodes evaluated by Alpha-Beta: {metrics.get_nodes_evaluated('alphabeta')}")
+        print(f"Total nodes evaluated by Negamax: {metrics.get_nodes_evaluated('negamax')}")
+        print(f"Branches pruned by Alpha-Beta: {metrics.get_pruned_branches('alphabeta')}")
         print(f"Execution time for Minimax: {metrics.get_execution_time('minimax'):.4f} seconds")
         print(f"Execution time for Alpha-Beta: {metrics.get_execution_time('alphabeta'):.4f} seconds")
+        print(f"Execution time for Negamax: {metrics.get_execution_time('negamax'):.4f} seconds")
 
         # Visualize Tree if applicable
         if tree_viz:
             if isinstance(agent2, AlphaBetaAgent) and agent2.last_tree:
-                tree_viz.visualize(agent2.last_tree["root"], "alphabeta_tree")
+                tree_viz.visualize(agent2.last_tree, "alphabeta_tree")
             elif isinstance(agent2, MinimaxAgent) and agent2.last_tree:
-                tree_viz.visualize(agent2.last_tree["root"], "minimax_tree")
+                tree_viz.visualize(agent2.last_tree, "minimax_tree")
 
     if viz == "gui":
         print("Game over. Close the Pygame window to exit.")
@@ -136,39 +144,15 @@ def main():
 def run_benchmark(size, depth, logger, metrics):
     print(f"\n🏆 Running benchmark on {size}x{size} board...")
 
-    if size == 5 and depth > 4:
-        print("⚠️ Reducing depth to 3 for 5x5 benchmark to prevent timeout.")
-        depth = 3
-
-    view = ConsoleView()  # Use text mode for benchmarking
-
-    ai_combos = [
-        ('minimax', 'minimax'),
-        ('alphabeta', 'alphabeta'),
-        ('minimax', 'alphabeta'),
-        ('minimax', 'gemini'),
-        ('alphabeta', 'gemini')
-    ]
-
-    for ai1, ai2 in ai_combos:
-        print(f"\n🚀 Testing {ai1} (X) vs {ai2} (O)...")
-        wins = {'X': 0, 'O': 0, 'draw': 0}
-
-        for i in range(5):  # Reduce to 5 games for speed
-            metrics.reset()
-            agent1 = get_agent(ai1, 'X', depth)
-            agent2 = get_agent(ai2, 'O', depth)
-            game = TicTacToe(board_size=size, agent1=agent1, agent2=agent2,
-                             view=view, metrics=metrics, tree_viz=None, quiet=True)
-            winner = game.play()
-            if winner:
-                wins[winner] += 1
-            else:
-                wins['draw'] += 1
-
-            metrics.save_to_file(f"results/metrics/benchmark_{ai1}_vs_{ai2}_game{i+1}.json")
-
-        print(f"{ai1} (X) vs {ai2} (O): {wins['X']} Wins | {wins['O']} Wins | {wins['draw']} Draws")
+    # A full-depth 5x5 search never finishes, so each move deepens until its time runs out instead
+    time_limit = None
+    if size == 5:
+        time_limit = BENCHMARK_TIME_LIMIT
+        print(f"⏱️ Searching each 5x5 move for up to {time_limit}s (iterative deepening to depth {depth}).")
+
+    # Games run headless on a process pool; each one is printed as it finishes
+    results = run_benchmark_matrix(DEFAULT_PAIRINGS, [size], [depth], games=5, time_limit=time_limit)
+    logger.log(f"Benchmark of {len(results)} games saved to {RESULTS_PATH}")
 
     print("\n📊 Benchmark complete.")
 
@@ -0,0 +1,172 @@
+import math
+
+PERCENTILES = (50, 90, 99)
+
+
+class LatencyHistogram:
+    def __init__(self, min_value=1e-6, max_value=3600.0, relative_error=0.01):
+        """
+        Initialize a log-bucketed (HDR-style) latency histogram.
+
+        Bucket widths grow geometrically, so every recorded value is reported within
+        relative_error of its true value whether it is a microsecond or a minute,
+        and memory is bounded by the number of buckets in use rather than the
+        number of values recorded. count, mean, min and max are exact.
+
+        Args:
+            min_value (float): Smallest distinguishable value in seconds; smaller values share the first bucket
+            max_value (float): Largest distinguishable value in seconds; larger values share the last bucket
+            relative_error (float): Largest relative error of a reported percentile
+        """
+        self.min_value = min_value
+        self.max_value = max_value
+        self.relative_error = relative_error
+        self._log_growth = math.log((1 + relative_error) / (1 - relative_error))
+        self._last_bucket = self._bucket_of(max_value)
+
+        self.buckets = {}  # bucket index -> count, only for buckets in use
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket_of(self, value):
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_growth) + 1
+
+    def _bucket_value(self, index):
+        """Representative value of a bucket: the geometric middle of its range."""
+        if index == 0:
+            return self.min_value
+        return self.min_value * math.exp((index - 0.5) * self._log_growth)
+
+    def record(self, value):
+        """
+        Record one latency.
+
+        Args:
+            value (float): Latency in seconds
+        """
+        index = min(self._bucket_of(value), self._last_bucket)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        """
+        Add another histogram's values to this one (e.g. from another game or worker process).
+
+        Args:
+            other (LatencyHistogram): Histogram with the same bucket settings
+
+        Returns:
+            LatencyHistogram: self
+        """
+        if (other.min_value, other.max_value, other.relative_error) != (self.min_value, self.max_value,
+                                                                         self.relative_error):
+            raise ValueError("Cannot merge histograms with different bucket settings")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """
+        Get the value below which a given percentage of the recorded latencies fall.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: The latency in seconds (0.0 if nothing was recorded)
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                # Clamp to the exact extremes so p0/p100 and single-value histograms are exact
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    def count_at_or_below(self, value):
+        """
+        Count recorded latencies up to a value (within the bucket resolution).
+
+        Args:
+            value (float): Upper bound in seconds
+
+        Returns:
+            int: Number of recorded latencies at or below value
+        """
+        if self.max is not None and value >= self.max:
+            return self.count
+        limit = self._bucket_of(value)
+        return sum(count for index, count in list(self.buckets.items()) if index <= limit)
+
+    def mean(self):
+        """Get the exact mean latency in seconds (0.0 if nothing was recorded)."""
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self):
+        """
+        Get the headline numbers.
+
+        Returns:
+            dict: count, mean, p50, p90, p99 and max in seconds
+        """
+        summary = {'count': self.count, 'mean': self.mean()}
+        for percent in PERCENTILES:
+            summary[f'p{percent}'] = self.percentile(percent)
+        summary['max'] = self.max if self.max is not None else 0.0
+        return summary
+
+    def to_dict(self):
+        """
+        Serialize the histogram to JSON-friendly data.
+
+        Returns:
+            dict: Bucket settings, counts and the summary percentiles
+        """
+        return {
+            'min_value': self.min_value,
+            'max_value': self.max_value,
+            'relative_error': self.relative_error,
+            'buckets': {str(index): count for index, count in sorted(self.buckets.items())},
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'summary': self.summary()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuild a histogram from to_dict() output.
+
+        Args:
+            data (dict): Serialized histogram
+
+        Returns:
+            LatencyHistogram: The histogram
+        """
+        histogram = cls(data['min_value'], data['max_value'], data['relative_error'])
+        histogram.buckets = {int(index): count for index, count in data['buckets'].items()}
+        histogram.count = data['count']
+        histogram.total = data['total']
+        histogram.min = data['min']
+        histogram.max = data['max']
+        return histogram
+
+    def __len__(self):
+        return self.count
@@ -1,55 +1,127 @@
 import os
 import time
+import atexit
+import queue
+import threading
+from collections import deque
 from datetime import datetime
 
+# Queue markers for the buffered writer thread
+_FLUSH = object()
+_STOP = object()
+
 class Logger:
     _instance = None
-    
-    def __new__(cls, filename=None):
+
+    def __new__(cls, filename=None, **kwargs):
         if cls._instance is None:
             cls._instance = super(Logger, cls).__new__(cls)
             cls._instance._initialized = False
         return cls._instance
-    
-    def __init__(self, filename=None):
+
+    def __init__(self, filename=None, buffered=False, flush_size=64, flush_interval=1.0, max_entries=1000):
+        """
+        Initialize the logger (once; later calls return the same instance unchanged).
+
+        In buffered mode log() only queues the line: a background thread appends
+        queued lines in batches, once flush_size lines are waiting or flush_interval
+        seconds after the first of them, and whatever is left is written at exit.
+
+        Args:
+            filename (str): Log file name inside logs/ (timestamped if None)
+            buffered (bool): Write from a background thread instead of opening the file per call
+            flush_size (int): Most lines written per batch
+            flush_interval (float): Longest time in seconds a queued line waits to be written
+            max_entries (int): Entries kept in memory for get_logs (None keeps all)
+        """
         if not self._initialized:
             self._initialized = True
-            self.logs = []
-            
+            self.logs = deque(maxlen=max_entries)  # Most recent entries only
+
             # Create log directory if it doesn't exist
             os.makedirs("logs", exist_ok=True)
-            
+
             if filename is None:
                 self.filename = f"logs/game_log_{time.strftime('%Y%m%d_%H%M%S')}.txt"
             else:
                 self.filename = f"logs/{filename}"
-    
+
+            self.buffered = buffered
+            self.flush_size = flush_size
+            self.flush_interval = flush_interval
+            self._queue = None
+            self._writer = None
+            if buffered:
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(target=self._write_loop, name="logger-writer", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
     def log(self, message):
         """
         Log a message.
-        
+
         Args:
             message (str): The message to log
         """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_entry = f"[{timestamp}] {message}"
         self.logs.append(log_entry)
-        
+
         # Also write to file
-        with open(self.filename, "a") as f:
-            f.write(log_entry + "\n")
-        
+        if self._writer is not None:
+            self._queue.put(log_entry)
+        else:
+            with open(self.filename, "a") as f:
+                f.write(log_entry + "\n")
+
         return log_entry
-    
+
+    def _write_loop(self):
+        """Append queued entries to the log file in batches until close() is called."""
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while batch[-1] is not _FLUSH and batch[-1] is not _STOP and len(batch) < self.flush_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            lines = [entry for entry in batch if entry is not _FLUSH and entry is not _STOP]
+            if lines:
+                with open(self.filename, "a") as f:
+                    f.write("\n".join(lines) + "\n")
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is _STOP:
+                return
+
+    def flush(self):
+        """Block until every logged entry has been written to the file."""
+        if self._writer is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Write the remaining entries and stop the writer thread (runs at exit in buffered mode)."""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._writer = None  # Later entries are written directly
+
     def get_logs(self):
         """
         Get all logs.
-        
+
         Returns:
             list: List of log entries
         """
-        return self.logs
-    
+        return list(self.logs)
+
     def clear(self):
         """Clear all logs."""
-        self.logs = []
\ No newline at end of file
+        self.logs.clear()
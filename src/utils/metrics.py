@@ -1,9 +1,9 @@
 import os
 import json
 import time
-import matplotlib.pyplot as plt
-import pandas as pd
+import contextlib
 import numpy as np
+from utils.histogram import LatencyHistogram, PERCENTILES
 
 class MetricsCollector:
     _instance = None
@@ -23,12 +23,36 @@ class MetricsCollector:
             os.makedirs("results/metrics", exist_ok=True)
             os.makedirs("results/visualizations", exist_ok=True)
     
+    @classmethod
+    @contextlib.contextmanager
+    def scoped(cls):
+        """
+        Collect the metrics recorded inside a with-block into a collector of their own.
+
+        MetricsCollector() returns the block's collector until the block ends and the
+        previous singleton afterwards, which keeps its totals untouched.
+
+        Yields:
+            MetricsCollector: The block's collector
+        """
+        previous = cls._instance
+        cls._instance = None
+        try:
+            yield cls()
+        finally:
+            cls._instance = previous
+
     def reset(self):
         """Reset all metrics."""
+        # move_latency is a bounded LatencyHistogram rather than a list of every move time
         self.algorithm_stats = {
-            'minimax': {'nodes_evaluated': 0, 'execution_time': 0, 'move_times': []},
-            'alphabeta': {'nodes_evaluated': 0, 'execution_time': 0, 'move_times': [], 'pruned_branches': 0},
-            'gemini': {'nodes_evaluated': 0, 'execution_time': 0, 'move_times': []},
+            'minimax': {'nodes_evaluated': 0, 'execution_time': 0, 'move_latency': LatencyHistogram()},
+            'alphabeta': {'nodes_evaluated': 0, 'execution_time': 0, 'move_latency': LatencyHistogram(),
+                          'pruned_branches': 0, 'cache_hits': 0, 'cache_misses': 0, 'cache_stores': 0},
+            'negamax': {'nodes_evaluated': 0, 'execution_time': 0, 'move_latency': LatencyHistogram(),
+                        'pruned_branches': 0, 'cache_hits': 0, 'cache_misses': 0, 'cache_stores': 0},
+            'gemini': {'nodes_evaluated': 0, 'execution_time': 0, 'move_latency': LatencyHistogram(),
+                       'cache_hits': 0, 'cache_misses': 0, 'cache_stores': 0},
         }
         self.benchmark_results = {}
     
@@ -54,7 +78,7 @@ class MetricsCollector:
             time_taken (float): Time taken for the move in seconds
         """
         if algorithm in self.algorithm_stats:
-            self.algorithm_stats[algorithm]['move_times'].append(time_taken)
+            self.algorithm_stats[algorithm]['move_latency'].record(time_taken)
     
     def record_pruned_branches(self, algorithm, pruned_branches):
         """
@@ -67,6 +91,148 @@ class MetricsCollector:
         if algorithm in self.algorithm_stats and 'pruned_branches' in self.algorithm_stats[algorithm]:
             self.algorithm_stats[algorithm]['pruned_branches'] += pruned_branches
     
+    def record_cache_stats(self, algorithm, hits, misses, stores):
+        """
+        Record cache statistics (transposition table or Gemini response cache lookups).
+        
+        Args:
+            algorithm (str): The algorithm name
+            hits (int): Number of lookups that found an entry
+            misses (int): Number of lookups that found nothing
+            stores (int): Number of entries written
+        """
+        if algorithm in self.algorithm_stats and 'cache_hits' in self.algorithm_stats[algorithm]:
+            self.algorithm_stats[algorithm]['cache_hits'] += hits
+            self.algorithm_stats[algorithm]['cache_misses'] += misses
+            self.algorithm_stats[algorithm]['cache_stores'] += stores
+    
+    def record_ordering_stats(self, algorithm, ordering, nodes_evaluated, cutoffs):
+        """
+        Record search effort for a move ordering configuration.
+        
+        Args:
+            algorithm (str): The algorithm name
+            ordering (str): Label of the ordering heuristics used ('none' for row-major order)
+            nodes_evaluated (int): Number of nodes evaluated for the move
+            cutoffs (int): Number of beta cutoffs during the move
+        """
+        if algorithm not in self.algorithm_stats:
+            return
+        stats = self.algorithm_stats[algorithm].setdefault('ordering', {}).setdefault(
+            ordering, {'moves': 0, 'nodes_evaluated': 0, 'cutoffs': 0})
+        stats['moves'] += 1
+        stats['nodes_evaluated'] += nodes_evaluated
+        stats['cutoffs'] += cutoffs
+    
+    def record_search_report(self, algorithm, report):
+        """
+        Record the search report of one move.
+        
+        Args:
+            algorithm (str): The algorithm name
+            report (dict): Per-move report from SearchStats.report (nodes and cutoffs per ply,
+                branching factor, nodes/sec, leaf counts, cache stats)
+        """
+        if algorithm in self.algorithm_stats:
+            self.algorithm_stats[algorithm].setdefault('search_reports', []).append(report)
+    
+    def get_search_reports(self, algorithm):
+        """
+        Get the per-move search reports of an algorithm.
+        
+        Args:
+            algorithm (str): The algorithm name
+            
+        Returns:
+            list: One report dict per searched move, in move order
+        """
+        return self.algorithm_stats.get(algorithm, {}).get('search_reports', [])
+    
+    def get_ordering_stats(self, algorithm):
+        """
+        Get search effort per move ordering configuration.
+        
+        Args:
+            algorithm (str): The algorithm name
+            
+        Returns:
+            dict: Ordering label -> moves, nodes evaluated and cutoffs
+        """
+        return self.algorithm_stats.get(algorithm, {}).get('ordering', {})
+    
+    def get_cache_stats(self, algorithm):
+        """
+        Get cache statistics for an algorithm.
+        
+        Args:
+            algorithm (str): The algorithm name
+            
+        Returns:
+            dict: Cache hits, misses and stores
+        """
+        stats = self.algorithm_stats.get(algorithm, {})
+        return {key: stats.get(f'cache_{key}', 0) for key in ('hits', 'misses', 'stores')}
+    
+    def get_move_latency(self, algorithm):
+        """
+        Get move latency percentiles of an algorithm.
+        
+        Args:
+            algorithm (str): The algorithm name
+            
+        Returns:
+            dict: count, mean, p50, p90, p99 and max move time in seconds
+        """
+        if algorithm in self.algorithm_stats:
+            return self.algorithm_stats[algorithm]['move_latency'].summary()
+        return LatencyHistogram().summary()
+    
+    def merge_move_latency(self, algorithm, histogram):
+        """
+        Merge move latencies recorded elsewhere (another game or worker process).
+        
+        Args:
+            algorithm (str): The algorithm name
+            histogram: A LatencyHistogram, or its to_dict() form
+        """
+        if algorithm not in self.algorithm_stats:
+            return
+        if isinstance(histogram, dict):
+            histogram = LatencyHistogram.from_dict(histogram)
+        self.algorithm_stats[algorithm]['move_latency'].merge(histogram)
+    
+    def merge_stats(self, algorithm_stats):
+        """
+        Add stats collected elsewhere (e.g. a benchmark worker's to_dict() output) to this collector.
+        
+        Counters are summed and latency histograms merged; per-move lists are not copied.
+        
+        Args:
+            algorithm_stats (dict): Algorithm name -> stats, as returned by to_dict()
+        """
+        for algorithm, stats in algorithm_stats.items():
+            if algorithm not in self.algorithm_stats:
+                continue
+            own = self.algorithm_stats[algorithm]
+            for key, value in stats.items():
+                if key == 'move_latency':
+                    self.merge_move_latency(algorithm, value)
+                elif isinstance(value, (int, float)) and key in own:
+                    own[key] += value
+    
+    def to_dict(self):
+        """
+        Get the algorithm stats as JSON-serializable data.
+        
+        Returns:
+            dict: algorithm_stats with each latency histogram in its to_dict() form
+        """
+        return {
+            algorithm: {key: value.to_dict() if isinstance(value, LatencyHistogram) else value
+                        for key, value in stats.items()}
+            for algorithm, stats in self.algorithm_stats.items()
+        }
+    
     def get_nodes_evaluated(self, algorithm):
         """
         Get the number of nodes evaluated by an algorithm.
@@ -117,7 +283,17 @@ class MetricsCollector:
             filename (str): The filename
         """
         with open(filename, 'w') as f:
-            json.dump(self.algorithm_stats, f, indent=4)
+            json.dump(self.to_dict(), f, indent=4)
+    
+    def save_to_store(self, store, **fields):
+        """
+        Append the current metrics to a results store as one 'game' record.
+        
+        Args:
+            store: A ResultsStore (see utils/results_store.py)
+            **fields: Extra fields for the record (agents, winner, board size, ...)
+        """
+        store.append('game', dict(fields, algorithm_stats=self.to_dict()))
     
     def save_benchmark_results(self, filename):
         """
@@ -126,31 +302,33 @@ class MetricsCollector:
         Args:
             filename (str): The filename
         """
-        self.benchmark_results = self.algorithm_stats
+        self.benchmark_results = self.to_dict()
         with open(filename, 'w') as f:
             json.dump(self.benchmark_results, f, indent=4)
     
     def generate_comparative_charts(self):
         """Generate comparative charts for visualization."""
+        import matplotlib.pyplot as plt  # Deferred: only chart generation needs matplotlib
+
         # Create directories if they don't exist
         os.makedirs("results/visualizations", exist_ok=True)
         
         # Only generate charts if we have data
-        if not self.algorithm_stats['minimax']['move_times'] and not self.algorithm_stats['alphabeta']['move_times']:
+        if not any(stats['move_latency'].count for stats in self.algorithm_stats.values()):
             return
         
         # Prepare data
         algorithms = []
         nodes_evaluated = []
         execution_times = []
-        avg_move_times = []
+        latencies = []
         
         for alg, stats in self.algorithm_stats.items():
             if stats['nodes_evaluated'] > 0:
                 algorithms.append(alg)
                 nodes_evaluated.append(stats['nodes_evaluated'])
                 execution_times.append(stats['execution_time'])
-                avg_move_times.append(sum(stats['move_times']) / len(stats['move_times']) if stats['move_times'] else 0)
+                latencies.append(stats['move_latency'].summary())
         
         # Chart 1: Nodes Evaluated
         plt.figure(figsize=(10, 6))
@@ -172,14 +350,21 @@ class MetricsCollector:
         plt.savefig('results/visualizations/execution_time_comparison.png')
         plt.close()
         
-        # Chart 3: Average Move Time
+        # Chart 3: Move Time Percentiles (averages hide slow first moves, so show the tail)
+        labels = [f'p{percent}' for percent in PERCENTILES] + ['max']
+        positions = np.arange(len(algorithms))
+        width = 0.8 / len(labels)
         plt.figure(figsize=(10, 6))
-        plt.bar(algorithms, avg_move_times)
-        plt.title('Average Move Time Comparison')
+        for i, label in enumerate(labels):
+            plt.bar(positions + i * width, [latency[label] for latency in latencies], width, label=label)
+        plt.xticks(positions + width * (len(labels) - 1) / 2, algorithms)
+        plt.yscale('log')
+        plt.title('Move Time Percentiles')
         plt.xlabel('Algorithm')
-        plt.ylabel('Time (seconds)')
+        plt.ylabel('Time (seconds, log scale)')
+        plt.legend()
         plt.grid(axis='y', linestyle='--', alpha=0.7)
-        plt.savefig('results/visualizations/avg_move_time_comparison.png')
+        plt.savefig('results/visualizations/move_time_percentiles.png')
         plt.close()
         
         # If we have pruning data, create a chart for that too
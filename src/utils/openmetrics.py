@@ -0,0 +1,201 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.histogram import LatencyHistogram
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PREFIX = "tictactoe"
+
+# Cumulative `le` boundaries of the exported move latency histogram, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (stats key, metric name, help text) of the per-algorithm counters
+COUNTERS = (
+    ('nodes_evaluated', 'nodes_evaluated', "Search nodes evaluated"),
+    ('pruned_branches', 'pruned_branches', "Branches cut off by alpha-beta pruning"),
+    ('execution_time', 'search_time_seconds', "Time spent searching, in seconds"),
+    ('cache_hits', 'cache_hits', "Transposition table or response cache lookups that found an entry"),
+    ('cache_misses', 'cache_misses', "Transposition table or response cache lookups that found nothing"),
+    ('cache_stores', 'cache_stores', "Transposition table or response cache entries written"),
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(metrics=None):
+    """
+    Render a MetricsCollector in the OpenMetrics text format.
+
+    Every algorithm gets counters for nodes, prunes, search time and cache lookups, a
+    move latency histogram and a gauge of its slowest move. Values are read from a
+    shallow copy of each stats dict, so this is safe to call from another thread
+    while a search is recording.
+
+    Args:
+        metrics: The MetricsCollector to export (the shared singleton if None)
+
+    Returns:
+        str: The exposition, ending with '# EOF'
+    """
+    if metrics is None:
+        from utils.metrics import MetricsCollector
+        metrics = MetricsCollector()
+
+    snapshot = {algorithm: dict(stats) for algorithm, stats in list(metrics.algorithm_stats.items())}
+    lines = []
+
+    for key, name, help_text in COUNTERS:
+        samples = [(algorithm, stats[key]) for algorithm, stats in snapshot.items() if key in stats]
+        if not samples:
+            continue
+        lines.append(f"# TYPE {PREFIX}_{name} counter")
+        lines.append(f"# HELP {PREFIX}_{name} {help_text}.")
+        for algorithm, value in samples:
+            lines.append(f"{PREFIX}_{name}_total{_labels(algorithm=algorithm)} {_number(value)}")
+
+    name = f"{PREFIX}_move_latency_seconds"
+    lines.append(f"# TYPE {name} histogram")
+    lines.append(f"# UNIT {name} seconds")
+    lines.append(f"# HELP {name} Time taken to choose a move.")
+    for algorithm, stats in snapshot.items():
+        histogram = stats.get('move_latency')
+        if histogram is None:
+            histogram = LatencyHistogram()
+        count, total = histogram.count, histogram.total
+        for bound in LATENCY_BUCKETS:
+            # Clamp so a move recorded mid-render cannot push a bucket past the +Inf count
+            below = min(histogram.count_at_or_below(bound), count)
+            lines.append(f"{name}_bucket{_labels(algorithm=algorithm, le=bound)} {below}")
+        lines.append(f"{name}_bucket{_labels(algorithm=algorithm, le='+Inf')} {count}")
+        lines.append(f"{name}_count{_labels(algorithm=algorithm)} {count}")
+        lines.append(f"{name}_sum{_labels(algorithm=algorithm)} {_number(float(total))}")
+
+    name = f"{PREFIX}_move_latency_max_seconds"
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"# UNIT {name} seconds")
+    lines.append(f"# HELP {name} Slowest move so far.")
+    for algorithm, stats in snapshot.items():
+        histogram = stats.get('move_latency')
+        slowest = histogram.max if histogram is not None and histogram.max is not None else 0.0
+        lines.append(f"{name}{_labels(algorithm=algorithm)} {_number(float(slowest))}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_file(path, metrics=None):
+    """
+    Write the exposition to a file, replacing it atomically so scrapers never read a partial file.
+
+    Args:
+        path (str): Output file (e.g. for a node exporter textfile collector)
+        metrics: The MetricsCollector to export (the shared singleton if None)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(render(metrics))
+    os.replace(tmp_path, path)
+
+
+class OpenMetricsExporter:
+    def __init__(self, metrics=None, path=None, interval=10.0, port=None, host="127.0.0.1"):
+        """
+        Export a MetricsCollector from background threads.
+
+        Rendering happens on the exporter's own threads, so the game and search
+        threads never wait on a scrape or a file write.
+
+        Args:
+            metrics: The MetricsCollector to export (the shared singleton at construction if None,
+                so games collected with MetricsCollector.scoped() do not replace it)
+            path (str): File rewritten every interval seconds, if given
+            interval (float): Seconds between file writes
+            port (int): Serve /metrics over HTTP on this port, if given (0 picks a free port)
+            host (str): Interface to serve on
+        """
+        if metrics is None:
+            from utils.metrics import MetricsCollector
+            metrics = MetricsCollector()
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.port = port
+        self.host = host
+
+        self._stop = threading.Event()
+        self._writer = None
+        self._server = None
+        self._server_thread = None
+
+    def start(self):
+        """
+        Start the file writer and/or HTTP server threads.
+
+        Returns:
+            OpenMetricsExporter: self
+        """
+        if self.path is not None and self._writer is None:
+            self._stop.clear()
+            self._writer = threading.Thread(target=self._write_loop, name="openmetrics-writer", daemon=True)
+            self._writer.start()
+
+        if self.port is not None and self._server is None:
+            exporter = self
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] != '/metrics':
+                        self.send_error(404)
+                        return
+                    body = render(exporter.metrics).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header("Content-Type", CONTENT_TYPE)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass  # Keep scrapes out of the game's console output
+
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+            self._server.daemon_threads = True
+            self.port = self._server.server_address[1]
+            self._server_thread = threading.Thread(target=self._server.serve_forever, name="openmetrics-http",
+                                                   daemon=True)
+            self._server_thread.start()
+        return self
+
+    def _write_loop(self):
+        while True:
+            write_file(self.path, self.metrics)
+            if self._stop.wait(self.interval):
+                break
+
+    def stop(self):
+        """Stop the threads, writing the file one last time so it holds the final values."""
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+            write_file(self.path, self.metrics)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server_thread.join()
+            self._server = None
+            self._server_thread = None
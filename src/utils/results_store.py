@@ -0,0 +1,238 @@
+import json
+import os
+import platform
+import sys
+import time
+import uuid
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_PATH = "results/results.jsonl"
+
+
+def new_run_id():
+    """Create a unique, time-sortable run id."""
+    return f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+
+
+def _locked_append(path, data):
+    """
+    Append bytes to a file as one write under an exclusive lock.
+
+    Writers in other processes (benchmark workers, parallel runs) take the same lock,
+    so their records never interleave.
+
+    Args:
+        path (str): File to append to
+        data (bytes): Complete lines to append
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        try:
+            os.write(fd, data)
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+class ResultsStore:
+    def __init__(self, path=DEFAULT_PATH, run_id=None):
+        """
+        Initialize an append-only JSON Lines results store.
+
+        Every record is one line tagged with its type ('run', 'game', 'move', ...) and
+        run id. Pass the run_id of an existing run to add records to it from another
+        process, e.g. a benchmark worker.
+
+        Args:
+            path (str): JSON Lines file to append to
+            run_id (str): Run the records belong to; a new one is created if None
+        """
+        self.path = path
+        self.run_id = run_id or new_run_id()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def start_run(self, **metadata):
+        """
+        Write the metadata record of this run.
+
+        Args:
+            **metadata: Run settings (mode, agents, sizes, ...) stored with the host details
+        """
+        self.append('run', dict({
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'host': platform.node(),
+            'platform': platform.platform(),
+            'python': platform.python_version(),
+            'cpu_count': os.cpu_count(),
+            'argv': sys.argv
+        }, **metadata))
+
+    def append(self, record_type, record):
+        """
+        Append one record.
+
+        Args:
+            record_type (str): Record type, e.g. 'game' or 'move'
+            record (dict): JSON-serializable fields
+        """
+        self.append_many(record_type, [record])
+
+    def append_many(self, record_type, records):
+        """
+        Append several records of one type in a single locked write.
+
+        Args:
+            record_type (str): Record type, e.g. 'game' or 'move'
+            records (list): JSON-serializable dicts
+        """
+        if not records:
+            return
+        timestamp = time.time()
+        lines = [
+            json.dumps(dict({'type': record_type, 'run_id': self.run_id, 'time': timestamp}, **record))
+            for record in records
+        ]
+        _locked_append(self.path, ("\n".join(lines) + "\n").encode('utf-8'))
+
+
+def load_records(path=DEFAULT_PATH, record_type=None, run_id=None):
+    """
+    Load records from a results file in one read.
+
+    Args:
+        path (str): JSON Lines results file
+        record_type (str): Only return records of this type, if given
+        run_id (str): Only return records of this run, if given
+
+    Returns:
+        list: Record dicts in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    records = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue  # A line cut short by a crashed writer
+        if record_type is not None and record.get('type') != record_type:
+            continue
+        if run_id is not None and record.get('run_id') != run_id:
+            continue
+        records.append(record)
+    return records
+
+
+def load_frame(path=DEFAULT_PATH, record_type='game', with_run_metadata=True):
+    """
+    Load one record type as a flat pandas DataFrame.
+
+    Nested fields become dotted columns (e.g. algorithm_stats.alphabeta.nodes_evaluated).
+
+    Args:
+        path (str): JSON Lines results file
+        record_type (str): Record type to load
+        with_run_metadata (bool): Add each record's run metadata as run.* columns
+
+    Returns:
+        pandas.DataFrame: One row per record
+    """
+    import pandas as pd
+
+    records = load_records(path)
+    rows = [record for record in records if record.get('type') == record_type]
+    if with_run_metadata:
+        runs = {record['run_id']: record for record in records if record.get('type') == 'run'}
+        rows = [
+            dict(row, run={key: value for key, value in runs.get(row.get('run_id'), {}).items()
+                           if key not in ('type', 'run_id', 'time')})
+            for row in rows
+        ]
+    return pd.json_normalize(rows)
+
+
+def compact(path=DEFAULT_PATH, output=None, record_type='game', fmt=None):
+    """
+    Write one record type of a results file to a columnar file for fast bulk loading.
+
+    Parquet is used when pyarrow is installed, otherwise a compressed NumPy .npz
+    archive with one array per column. List and dict values are stored as JSON text.
+
+    Args:
+        path (str): JSON Lines results file
+        output (str): Output file; defaults to the input path with a .parquet or .npz suffix
+        record_type (str): Record type to compact
+        fmt (str): 'parquet' or 'npz'; picked automatically if None
+
+    Returns:
+        str: The path written
+    """
+    if fmt is None:
+        try:
+            import pyarrow  # noqa: F401
+            fmt = 'parquet'
+        except ImportError:
+            fmt = 'npz'
+    if fmt not in ('parquet', 'npz'):
+        raise ValueError(f"Unknown columnar format: {fmt}")
+    if output is None:
+        output = f"{os.path.splitext(path)[0]}_{record_type}.{fmt}"
+
+    from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+    frame = load_frame(path, record_type)
+    text_columns = [column for column in frame.columns
+                    if not (is_numeric_dtype(frame[column]) or is_bool_dtype(frame[column]))]
+    for column in text_columns:
+        frame[column] = frame[column].map(
+            lambda value: json.dumps(value) if isinstance(value, (list, dict)) else
+            '' if value is None or value != value else str(value)
+        )
+
+    tmp_path = f"{output}.{os.getpid()}.tmp"
+    if fmt == 'parquet':
+        frame.to_parquet(tmp_path, index=False)
+    else:
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **{column: frame[column].to_numpy(dtype=str if column in text_columns else None)
+                                      for column in frame.columns})
+    os.replace(tmp_path, output)
+    return output
+
+
+def load_compacted(path):
+    """
+    Load a file written by compact().
+
+    Args:
+        path (str): .parquet or .npz file
+
+    Returns:
+        pandas.DataFrame: One row per record
+    """
+    import pandas as pd
+
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    with np.load(path) as archive:
+        return pd.DataFrame({column: archive[column] for column in archive.files})
@@ -1,6 +1,10 @@
 import pygame
+import random
 import time
 import sys
+import threading
+import multiprocessing
+from agents.human_agent import HumanAgent
 
 class GUIView:
     def __init__(self, game):
@@ -10,7 +14,7 @@ class GUIView:
 
         # Game instance
         self.game = game
-        
+
         # Set up the display
         self.cell_size = 100
         self.width = 600
@@ -28,15 +32,34 @@ class GUIView:
 
         # Font
         self.font = pygame.font.SysFont(None, 40)
+        self.small_font = pygame.font.SysFont(None, 26)
 
         # Current board size
         self.board_size = game.board.size
 
-    def display_board(self):
-        """Display the board using pygame and keep the game responsive."""
+        # AI moves are searched on a worker thread while the event loop keeps running
+        self._search = None       # (thread, result dict, agent, start time, stop flag) of the running search
+        self._cancelled = False   # The running search's move will be thrown away
+        self._highlight = None    # (row, col, until) of the last move, shaded until `until`
+        self._banner = None       # (text, color) shown once the game is over
+        self._turn_start = time.time()  # When the human to move got the turn, for the move's recorded time
+        self.game_over = False
+        self.on_finish = None     # Called with the winner's mark (None for a draw) once the game is over
+
+    def display_board(self, board=None):
+        """Display the board using pygame and keep the game responsive (always draws self.game.board)."""
         self.cell_size = min(self.width, self.height) // self.board_size
         self.screen.fill(self.WHITE)
 
+        # Shade the last move for a moment instead of pausing the loop
+        if self._highlight is not None:
+            row, col, until = self._highlight
+            if time.time() < until:
+                rect = pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
+                pygame.draw.rect(self.screen, self.GRAY, rect)
+            else:
+                self._highlight = None
+
         # Draw grid lines
         for i in range(1, self.board_size):
             pygame.draw.line(self.screen, self.BLACK, (i * self.cell_size, 0), (i * self.cell_size, self.board_size * self.cell_size), 2)
@@ -51,38 +74,42 @@ class GUIView:
                 elif board_state[row, col] == 'O':
                     self._draw_o(row, col)
 
+        if self._banner is not None:
+            self._draw_status(self._banner[0], self._banner[1], self.font)
+        elif self._search is not None:
+            _, _, agent, start_time, _ = self._search
+            if self._cancelled:
+                text = "Stopping the previous search..."
+            else:
+                text = (f"{self.game.current_player} is thinking... {getattr(agent, 'nodes_evaluated', 0):,} nodes "
+                        f"({time.time() - start_time:.1f}s)  Esc: take back  R: resign")
+            self._draw_status(text, self.BLACK, self.small_font)
+
         pygame.display.flip()  # Ensure display updates
 
     def display_move(self, mark, row, col):
         """Display a move using pygame."""
-        rect = pygame.Rect(col * self.cell_size, row * self.cell_size, self.cell_size, self.cell_size)
-        pygame.draw.rect(self.screen, self.GRAY, rect)
-
-        if mark == 'X':
-            self._draw_x(row, col)
-        else:
-            self._draw_o(row, col)
-
-        pygame.display.flip()
-        time.sleep(0.3)  # Short pause to show the move
+        self._highlight = (row, col, time.time() + 0.3)
+        self.display_board()
 
     def display_winner(self, mark):
         """Display the winner using pygame."""
-        text = self.font.render(f"Player {mark} wins!", True, self.GREEN)
-        text_rect = text.get_rect(center=(self.width // 2, self.height - 30))
-        self.screen.blit(text, text_rect)
-        pygame.display.flip()
-
-        self._wait_for_exit(3)
+        self._banner = (f"Player {mark} wins!", self.GREEN)
+        self.game_over = True
+        self.display_board()
 
     def display_draw(self):
         """Display a draw using pygame."""
-        text = self.font.render("Game ended in a draw!", True, self.BLUE)
-        text_rect = text.get_rect(center=(self.width // 2, self.height - 30))
-        self.screen.blit(text, text_rect)
-        pygame.display.flip()
+        self._banner = ("Game ended in a draw!", self.BLUE)
+        self.game_over = True
+        self.display_board()
 
-        self._wait_for_exit(3)
+    def _draw_status(self, text, color, font):
+        """Draw a line of text on a white strip at the bottom of the window."""
+        rendered = font.render(text, True, color)
+        text_rect = rendered.get_rect(center=(self.width // 2, self.height - 30))
+        pygame.draw.rect(self.screen, self.WHITE, text_rect.inflate(16, 10))
+        self.screen.blit(rendered, text_rect)
 
     def _draw_x(self, row, col):
         """Draw an X on the board."""
@@ -99,29 +126,11 @@ class GUIView:
         radius = self.cell_size // 2 - self.cell_size // 5
         pygame.draw.circle(self.screen, self.BLUE, (x, y), radius, 3)
 
-    def _wait_for_exit(self, seconds=None):
-        """Keep Pygame responsive and wait for user action or timeout."""
-        start_time = time.time()
-
-        while True:
-            if seconds is not None and time.time() - start_time > seconds:
-                break
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
-                    return
-
-            pygame.time.delay(50)  # Reduce CPU usage
-
     def run_main_loop(self):
         """✅ Main event loop to keep the game responsive and allow user interaction."""
-        running = True
-        self.display_board()  # Ensure board is drawn at start
+        clock = pygame.time.Clock()
 
-        while running:
+        while True:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     pygame.quit()
@@ -132,44 +141,115 @@ class GUIView:
                     col = x // self.cell_size
                     row = y // self.cell_size
                     self.handle_click(row, col)
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        self.cancel_search()
+                    elif event.key == pygame.K_r:
+                        self.resign()
 
-            pygame.time.delay(50)  # Prevents CPU overload
+            self._poll_search()
+            self.display_board()  # Redrawn every frame for the node counter and the move highlight
+            clock.tick(30)
 
     def handle_click(self, row, col):
         """Handles a player's move when they click on a cell."""
+        if self.game_over or not self._is_human(self.game.get_current_agent()):
+            return
+        if self._search is not None and not self._cancelled:
+            return  # The AI is thinking
         if self.game.board.is_valid_move(row, col):
-            current_player = self.game.current_player  # ✅ Get player from game instance
-            self.game.board.make_move(row, col, current_player)
-            self.display_board()
-
-            # ✅ Check if game is over
-            if self.game.board.is_game_over():
-                winner = self.game.board.get_winner()
-                if winner:
-                    self.display_winner(winner)
-                else:
-                    self.display_draw()
+            self.game.apply_move(self.game.get_current_agent(), (row, col), time.time() - self._turn_start)
+            self._after_move()
+
+    def cancel_search(self):
+        """Stop the AI's running search and take back the human move it answers."""
+        if self._search is None or self._cancelled or self.game_over:
+            return
+        previous_agent = self.game.agent2 if self.game.current_player == 'X' else self.game.agent1
+        if not self._is_human(previous_agent):
+            return  # Nothing to take back in AI vs AI games
+        # The worker stops at its next stop-flag check; whatever it returns is ignored
+        self._stop_search()
+        self.game.undo_move()
+        self._highlight = None
+        self._turn_start = time.time()
+
+    def resign(self):
+        """Let the human player resign, even while the AI is thinking."""
+        if self.game_over:
+            return
+        for agent, mark, winner in ((self.game.agent1, 'X', 'O'), (self.game.agent2, 'O', 'X')):
+            if self._is_human(agent):
+                if self._search is not None:
+                    self._stop_search()
+                self._banner = (f"Player {mark} resigns. Player {winner} wins!", self.GREEN)
+                self.game_over = True
+                self.game.finish(announce=False)
+                if self.on_finish is not None:
+                    self.on_finish(winner)
                 return
 
-            # ✅ Switch player after a valid move
-            self.game.switch_player()
-
-            # ✅ If AI's turn, make the AI move automatically
-            ai_agent = self.game.get_current_agent()
-            if ai_agent:
-                pygame.time.delay(500)  # Small delay for better experience
-                ai_move = ai_agent.get_move(self.game.board)
-                self.game.board.make_move(ai_move[0], ai_move[1], self.game.current_player)
-                self.display_board()
-
-                # ✅ Check if AI wins
-                if self.game.board.is_game_over():
-                    winner = self.game.board.get_winner()
-                    if winner:
-                        self.display_winner(winner)
-                    else:
-                        self.display_draw()
-                    return
-
-                # ✅ Switch back to human
-                self.game.switch_player()
+    def _stop_search(self):
+        """Ask the running search to stop and throw away its move."""
+        self._cancelled = True
+        self._search[4].value = 1
+
+    def _is_human(self, agent):
+        return agent is None or isinstance(agent, HumanAgent)
+
+    def _poll_search(self):
+        """Play a finished search's move, then start the next AI search if an AI is to move."""
+        if self._search is not None:
+            thread, result, agent, start_time, _ = self._search
+            if thread.is_alive():
+                return
+            self._search = None
+            if self._cancelled:
+                self._cancelled = False
+            elif not self.game_over:
+                if 'error' in result:
+                    # A failed search must not stall the game: play any legal move in its place
+                    ai_move = random.choice(self.game.board.get_valid_moves())
+                    print(f"⚠️ {self.game.current_player}'s search failed ({result['error']!r}). "
+                          f"Playing random move {ai_move} instead.")
+                else:
+                    ai_move = result['move']
+                if not self.game.apply_move(agent, ai_move, time.time() - start_time):
+                    # apply_move reported the illegal move; asking the agent again could repeat it forever
+                    ai_move = random.choice(self.game.board.get_valid_moves())
+                    self.game.apply_move(agent, ai_move, time.time() - start_time)
+                self._after_move()
+
+        agent = self.game.get_current_agent()
+        if self._search is None and not self.game_over and not self._is_human(agent):
+            self._start_search(agent)
+
+    def _start_search(self, agent):
+        """Run agent.get_move on a worker thread, on a copy of the board."""
+        board = type(self.game.board)(self.game.board.size)
+        for row, col, mark in self.game.board.move_history:
+            board.make_move(row, col, mark)
+
+        result = {}
+        stop_flag = multiprocessing.Value('b', 0)
+        # Agents without a stop hook run to the end and their move is dropped
+        kwargs = {'stop_flag': stop_flag} if getattr(agent, 'supports_stop_flag', False) else {}
+
+        def search():
+            # An exception is handed to _poll_search; a stopped search's SearchTimeout is ignored there
+            try:
+                result['move'] = agent.get_move(board, **kwargs)
+            except Exception as e:
+                result['error'] = e
+
+        thread = threading.Thread(target=search, name="gui-search", daemon=True)
+        self._search = (thread, result, agent, time.time(), stop_flag)
+        thread.start()
+
+    def _after_move(self):
+        """End the game if the move just played (and recorded by apply_move) finished it."""
+        self._turn_start = time.time()
+        if self.game.board.is_game_over():
+            winner = self.game.finish()  # Saves the move records and shows the result
+            if self.on_finish is not None:
+                self.on_finish(winner)
@@ -1,12 +1,21 @@
 import os
-import matplotlib.pyplot as plt
-import networkx as nx
-from matplotlib.patches import Patch
+import json
 import time
+from agents.search_tree import PRUNED, UNSCORED
+
+SUMMARY_COLOR = 'lightgray'
+
 
 class TreeVisualizer:
-    def __init__(self):
-        """Initialize the tree visualizer."""
+    def __init__(self, max_nodes=300):
+        """
+        Initialize the tree visualizer.
+
+        Args:
+            max_nodes (int): Most nodes drawn per tree; deeper subtrees that do not fit
+                are collapsed into one summary node per parent
+        """
+        self.max_nodes = max_nodes
         os.makedirs("results/visualizations", exist_ok=True)
 
     def visualize(self, tree_data, filename_prefix):
@@ -14,35 +23,43 @@ class TreeVisualizer:
         Visualize a decision tree.
 
         Args:
-            tree_data (dict): Tree data structure.
+            tree_data: SearchTree, or the root of a nested-dict tree
+                ({'score', 'pruned', 'children': {move: node}})
             filename_prefix (str): Prefix for the output filename.
         """
-        if tree_data is None:
+        if tree_data is None or (hasattr(tree_data, 'get_children') and len(tree_data) == 0):
             print("No tree data available for visualization.")
             return
 
-        # Create a directed graph
-        G = nx.DiGraph()
-        node_labels = {}
-        node_colors = []
-
-        # Build the graph recursively
-        self._build_graph(G, tree_data, "root", None, node_labels, node_colors)
+        # Deferred so that constructing a visualizer (or exporting) does not load matplotlib
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        from matplotlib.patches import Patch
 
-        # Use a custom top-down layout
-        pos = self._hierarchical_layout(G)
+        scores, pruned, children, extra_edges = self._flatten(tree_data)
+        shown, shown_children, labels, colors = self._select(scores, pruned, children)
+        pos = self._hierarchical_layout(shown, shown_children)
 
-        # Draw the graph
-        plt.figure(figsize=(15, 10))
-        print(f"[TreeVisualizer] Nodes: {len(G.nodes)}, Colors: {len(node_colors)}")
+        # Scale the figure with the number of leaves and shrink nodes as the tree grows
+        leaves = sum(1 for node in shown if not shown_children[node])
+        width = min(max(15, leaves * 0.4), 120)
+        node_size = 1500 if len(shown) <= 40 else max(40, 60000 // len(shown))
+        fig, ax = plt.subplots(figsize=(width, 10))
+        print(f"[TreeVisualizer] Nodes: {len(scores)}, Drawn: {len(shown)}")
 
-        colors_to_use = node_colors[:len(G.nodes)]
+        segments = [(pos[parent], pos[child]) for parent in shown for child in shown_children[parent]]
+        segments += [(pos[parent], pos[child]) for parent, child in extra_edges if parent in pos and child in pos]
+        ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.5, zorder=1))
+        xs = [pos[node][0] for node in shown]
+        ys = [pos[node][1] for node in shown]
+        ax.scatter(xs, ys, s=node_size, c=[colors[node] for node in shown], edgecolors='gray', zorder=2)
 
-        nx.draw(
-            G, pos, with_labels=True, labels=node_labels,
-            node_color=colors_to_use,
-            node_size=1500, font_size=8, edge_color="gray"
-        )
+        # Labels stop being readable long before the drawing does
+        if len(shown) <= 150:
+            font_size = 8 if len(shown) <= 40 else 6
+            for node in shown:
+                ax.text(pos[node][0], pos[node][1], labels[node], ha='center', va='center', fontsize=font_size, zorder=3)
+        ax.axis('off')
 
         # Add color legend
         legend_elements = [
@@ -51,73 +68,218 @@ class TreeVisualizer:
             Patch(facecolor='lightyellow', edgecolor='gray', label='Neutral / Draw'),
             Patch(facecolor='red', edgecolor='gray', label='Pruned (Alpha-Beta)'),
             Patch(facecolor='white', edgecolor='gray', label='Unknown / Unscored'),
+            Patch(facecolor=SUMMARY_COLOR, edgecolor='gray', label='Collapsed subtree (+nodes)'),
         ]
-        plt.legend(handles=legend_elements, loc='lower left')
+        ax.legend(handles=legend_elements, loc='upper left')
 
         # Save the visualization
         timestamp = time.strftime("%Y%m%d_%H%M%S")
         filename = f"results/visualizations/{filename_prefix}_tree_{timestamp}.png"
-        plt.savefig(filename)
-        plt.close()
+        fig.savefig(filename)
+        plt.close(fig)
         print(f"✅ Decision tree visualization saved as: {filename}")
 
-    def _build_graph(self, G, node_data, node_id, parent_id, node_labels, node_colors):
+    def export(self, tree_data, filename_prefix, fmt='dot'):
         """
-        Recursively builds the graph for visualization.
+        Write the whole tree to a DOT or JSON file for offline rendering.
+
+        Nodes are written as they are walked, so the file is never held in memory.
 
         Args:
-            G (nx.DiGraph): Graph object.
-            node_data (dict): Tree node data.
-            node_id (str): Current node ID.
-            parent_id (str): Parent node ID.
-            node_labels (dict): Dictionary for node labels.
-            node_colors (list): List for node colors.
+            tree_data: SearchTree, or the root of a nested-dict tree
+            filename_prefix (str): Prefix for the output filename
+            fmt (str): 'dot' (Graphviz) or 'json' (a list of {id, parent, move, score, pruned})
+
+        Returns:
+            str: Path of the written file
         """
-        G.add_node(node_id)
-        node_labels[node_id] = node_id if node_id == "root" else f"{node_data.get('score', 'N/A')}"
-
-        # Determine node color based on score
-        if node_data.get("pruned"):
-            node_colors.append("red")
-        elif "score" in node_data:
-            score = node_data["score"]
-            if score > 0:
-                node_colors.append("lightgreen")
-            elif score < 0:
-                node_colors.append("lightblue")
+        if fmt not in ('dot', 'json'):
+            raise ValueError(f"Unknown export format: {fmt}")
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"results/visualizations/{filename_prefix}_tree_{timestamp}.{fmt}"
+
+        with open(filename, 'w') as f:
+            if fmt == 'dot':
+                f.write("digraph tree {\n  node [style=filled];\n")
+                seen = set()
+                for node, parent, move, score, pruned in self._walk(tree_data):
+                    if node not in seen:
+                        seen.add(node)
+                        color = self._color(score, pruned)
+                        label = "root" if parent is None else ("?" if score is None else score)
+                        f.write(f'  n{node} [label="{label}", fillcolor="{color}"];\n')
+                    if parent is not None:
+                        f.write(f'  n{parent} -> n{node} [label="{move}"];\n')
+                f.write("}\n")
             else:
-                node_colors.append("lightyellow")
-        else:
-            node_colors.append("white")
+                f.write("[")
+                separator = "\n"
+                for node, parent, move, score, pruned in self._walk(tree_data):
+                    f.write(separator + json.dumps(
+                        {'id': node, 'parent': parent, 'move': move, 'score': score, 'pruned': pruned}
+                    ))
+                    separator = ",\n"
+                f.write("\n]\n")
+
+        print(f"✅ Decision tree exported as: {filename}")
+        return filename
+
+    def _walk(self, tree_data):
+        """
+        Walk a tree without recursion.
+
+        Args:
+            tree_data: SearchTree, or the root of a nested-dict tree
+
+        Yields:
+            tuple: (node, parent, move, score, pruned) with unique integer node ids, root
+                first and every parent before its children. A node id seen before is an
+                extra edge into a shared (DAG) node.
+        """
+        if hasattr(tree_data, 'get_children'):
+            for index in range(len(tree_data)):
+                score = tree_data.scores[index]
+                move = tree_data.get_move(index)
+                yield (
+                    index, None if index == 0 else tree_data.parents[index],
+                    None if move is None else f"{move[0]},{move[1]}",
+                    None if score == UNSCORED else score, bool(tree_data.flags[index] & PRUNED)
+                )
+            for parent, child, cell in zip(tree_data.link_parents, tree_data.link_children, tree_data.link_moves):
+                row, col = divmod(cell, tree_data.size)
+                yield child, parent, f"{row},{col}", None, False
+            return
 
-        # Connect to parent
-        if parent_id:
-            G.add_edge(parent_id, node_id)
+        # Nested dicts: ids follow discovery order; a dict reached twice is a shared node
+        ids = {id(tree_data): 0}
+        yield 0, None, None, tree_data.get('score'), bool(tree_data.get('pruned'))
+        stack = [tree_data]
+        while stack:
+            node_data = stack.pop()
+            parent = ids[id(node_data)]
+            for move, child_data in node_data.get("children", {}).items():
+                child = ids.get(id(child_data))
+                if child is not None:
+                    yield child, parent, move, None, False
+                    continue
+                child = len(ids)
+                ids[id(child_data)] = child
+                yield child, parent, move, child_data.get('score'), bool(child_data.get('pruned'))
+                stack.append(child_data)
 
-        # Recurse for children
-        for move, child_data in node_data.get("children", {}).items():
-            self._build_graph(G, child_data, move, node_id, node_labels, node_colors)
+    def _flatten(self, tree_data):
+        """
+        Turn a tree into per-node lists indexed by node id.
 
-    def _hierarchical_layout(self, G, root="root", width=1.0, vert_gap=0.2, vert_loc=0, xcenter=0.5, pos=None, parent=None, visited=None):
+        Returns:
+            tuple: (scores, pruned, children, extra_edges), where children holds each
+                node's tree children and extra_edges the (parent, child) links into shared nodes
         """
-        A safe recursive top-down layout for trees (no Graphviz).
+        scores = []
+        pruned = []
+        children = []
+        extra_edges = []
+        for node, parent, _, score, is_pruned in self._walk(tree_data):
+            if node < len(scores):
+                extra_edges.append((parent, node))
+                continue
+            scores.append(score)
+            pruned.append(is_pruned)
+            children.append([])
+            if parent is not None:
+                children[parent].append(node)
+        return scores, pruned, children, extra_edges
+
+    def _select(self, scores, pruned, children):
         """
-        if pos is None:
-            pos = {}
-        if visited is None:
-            visited = set()
-        visited.add(root)
-
-        children = [n for n in G.neighbors(root) if n not in visited]
-
-        if len(children) != 0:
-            dx = width / len(children)
-            nextx = xcenter - width / 2 - dx / 2
-            for child in children:
-                nextx += dx
-                pos = self._hierarchical_layout(G, root=child, width=dx, vert_gap=vert_gap,
-                                                vert_loc=vert_loc - vert_gap, xcenter=nextx, pos=pos,
-                                                parent=root, visited=visited)
-        pos[root] = (xcenter, vert_loc)
-        return pos
+        Choose the nodes to draw, breadth first, within the max_nodes budget.
 
+        A node whose children do not all fit gets one summary node standing for all
+        of their subtrees instead, or a '+n' label once not even that fits.
+
+        Returns:
+            tuple: (shown, shown_children, labels, colors); summary nodes get ids past
+                the real nodes
+        """
+        # Subtree sizes: parents precede children in id order, so walk the ids backwards
+        sizes = [1] * len(scores)
+        for node in range(len(scores) - 1, -1, -1):
+            for child in children[node]:
+                sizes[node] += sizes[child]
+
+        shown = [0]
+        shown_children = {0: []}
+        labels = {0: "root"}
+        colors = {0: self._color(scores[0], pruned[0])}
+        summary_id = len(scores)
+        frontier = 0
+        while frontier < len(shown):
+            node = shown[frontier]
+            frontier += 1
+            if node >= len(scores) or not children[node]:
+                continue
+            kids = children[node]
+            if len(shown) + len(kids) <= self.max_nodes:
+                for child in kids:
+                    shown.append(child)
+                    shown_children[child] = []
+                    labels[child] = "N/A" if scores[child] is None else str(scores[child])
+                    colors[child] = self._color(scores[child], pruned[child])
+                shown_children[node] = list(kids)
+            elif len(shown) < self.max_nodes:
+                shown.append(summary_id)
+                shown_children[summary_id] = []
+                labels[summary_id] = f"+{sizes[node] - 1}"
+                colors[summary_id] = SUMMARY_COLOR
+                shown_children[node] = [summary_id]
+                summary_id += 1
+            else:
+                # No room left even for a summary node: note the hidden subtree on the node itself
+                labels[node] += f"\n+{sizes[node] - 1}"
+        return shown, shown_children, labels, colors
+
+    def _color(self, score, pruned):
+        """Get the fill color of a node from its score and pruned flag."""
+        if pruned:
+            return "red"
+        if score is None:
+            return "white"
+        if score > 0:
+            return "lightgreen"
+        if score < 0:
+            return "lightblue"
+        return "lightyellow"
+
+    def _hierarchical_layout(self, shown, shown_children, vert_gap=1.0):
+        """
+        Top-down layout in linear time, without recursion.
+
+        Leaves are spaced one unit apart in depth-first order and every parent sits
+        above the middle of its children.
+
+        Returns:
+            dict: Node id -> (x, y)
+        """
+        pos = {}
+        depth = {shown[0]: 0}
+        order = []
+        stack = [shown[0]]
+        next_x = 0
+        while stack:
+            node = stack.pop()
+            order.append(node)
+            kids = shown_children[node]
+            if not kids:
+                pos[node] = (next_x, -depth[node] * vert_gap)
+                next_x += 1
+            for child in reversed(kids):
+                depth[child] = depth[node] + 1
+                stack.append(child)
+
+        # Children come after their parent in `order`, so the reverse places them first
+        for node in reversed(order):
+            kids = shown_children[node]
+            if kids:
+                x = (pos[kids[0]][0] + pos[kids[-1]][0]) / 2
+                pos[node] = (x, -depth[node] * vert_gap)
+        return pos
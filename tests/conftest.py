@@ -0,0 +1,48 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+# The game runs from src/ (python src/main.py), so the tests import its modules the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """
+    Stands in for a Gemini model: answers prompts with canned replies, one per call, and records them.
+
+    A reply is the response text, an exception to raise, or a (delay, reply) pair that
+    sleeps delay seconds first. Calls may come from several request threads at once.
+    """
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+            reply = self.replies.pop(0)
+        if isinstance(reply, tuple):
+            delay, reply = reply
+            time.sleep(delay)
+        if isinstance(reply, Exception):
+            raise reply
+        return StubResponse(reply)
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run each test in an empty directory with no shared response caches left from other tests."""
+    monkeypatch.chdir(tmp_path)
+    from agents import response_cache
+    monkeypatch.setattr(response_cache, '_CACHES', {})
+    return tmp_path
@@ -0,0 +1,25 @@
+import argparse
+
+import pytest
+
+from agents.factory import AGENT_TYPES
+from benchmark import parse_pairing
+
+
+def test_pairing_is_split_and_normalized():
+    assert parse_pairing(" MiniMax:alphabeta") == ('minimax', 'alphabeta')
+
+
+@pytest.mark.parametrize('text', ["minimax", "minimax:alphabeta:negamax"])
+def test_pairing_needs_exactly_two_agents(text):
+    with pytest.raises(argparse.ArgumentTypeError, match="minimax:alphabeta"):
+        parse_pairing(text)
+
+
+def test_unknown_agent_lists_the_valid_names():
+    with pytest.raises(argparse.ArgumentTypeError) as error:
+        parse_pairing("minimax:alphabta")
+
+    assert "'alphabta'" in str(error.value)
+    for name in AGENT_TYPES:
+        assert name in str(error.value)
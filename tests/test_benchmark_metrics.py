@@ -0,0 +1,25 @@
+from benchmark import run_benchmark_matrix
+from utils.metrics import MetricsCollector
+from utils.openmetrics import OpenMetricsExporter
+
+
+def test_scoped_collector_leaves_the_singleton_alone():
+    outer = MetricsCollector()
+    with MetricsCollector.scoped() as inner:
+        assert MetricsCollector() is inner is not outer
+        inner.record_move_time('alphabeta', 0.1)
+    assert MetricsCollector() is outer
+
+
+def test_in_process_games_add_up_in_the_run_collector():
+    with MetricsCollector.scoped() as metrics:
+        exporter = OpenMetricsExporter()
+        results = run_benchmark_matrix([('alphabeta', 'alphabeta')], [3], [2], games=3, workers=1,
+                                       output=None, quiet=True)
+
+        moves = sum(result['moves'] for result in results)
+        assert exporter.metrics is metrics
+        assert metrics.algorithm_stats['alphabeta']['move_latency'].count == moves
+        assert metrics.algorithm_stats['alphabeta']['nodes_evaluated'] == sum(
+            result['algorithm_stats']['alphabeta']['nodes_evaluated'] for result in results
+        )
@@ -0,0 +1,50 @@
+from agents.minimax_agent import MinimaxAgent
+from game.game import TicTacToe
+
+
+class RecordingMetrics:
+    def __init__(self):
+        self.move_times = []
+
+    def record_move_time(self, agent_type, move_time):
+        self.move_times.append((agent_type, move_time))
+
+
+def make_game():
+    metrics = RecordingMetrics()
+    game = TicTacToe(3, MinimaxAgent('X', 1), MinimaxAgent('O', 1), metrics=metrics, quiet=True)
+    return game, metrics
+
+
+def test_illegal_move_is_not_recorded():
+    game, metrics = make_game()
+    assert game.apply_move(game.agent1, (0, 0), 0.5)
+
+    assert not game.apply_move(game.agent2, (0, 0), 0.25)
+    assert not game.apply_move(game.agent2, (3, 0), 0.25)
+
+    assert metrics.move_times == [('minimax', 0.5)]
+    assert len(game.move_records) == 1
+    assert game.current_player == 'O'
+
+
+def test_accepted_moves_are_numbered_in_order():
+    game, metrics = make_game()
+    game.apply_move(game.agent1, (1, 1), 0.5)
+    game.apply_move(game.agent2, (0, 0), 0.25)
+
+    assert [(record['move_number'], record['player'], record['row'], record['col'])
+            for record in game.move_records] == [(1, 'X', 1, 1), (2, 'O', 0, 0)]
+    assert metrics.move_times == [('minimax', 0.5), ('minimax', 0.25)]
+
+
+def test_undo_move_takes_back_the_record_and_the_turn():
+    game, _ = make_game()
+    game.apply_move(game.agent1, (1, 1), 0.5)
+    game.apply_move(game.agent2, (0, 0), 0.25)
+
+    game.undo_move()
+
+    assert game.board.move_history == [(1, 1, 'X')]
+    assert [record['move_number'] for record in game.move_records] == [1]
+    assert game.current_player == 'O'
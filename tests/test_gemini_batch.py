@@ -0,0 +1,88 @@
+import pytest
+
+from agents.gemini_agent import GeminiAgent
+from conftest import StubModel
+from game.board import Board
+
+
+def make_board(*moves):
+    """Build a 3x3 board from (row, col) moves, alternating X and O."""
+    board = Board(3)
+    for index, (row, col) in enumerate(moves):
+        board.make_move(row, col, 'X' if index % 2 == 0 else 'O')
+    return board
+
+
+@pytest.fixture
+def boards():
+    # Three positions with X to move
+    return [make_board(), make_board((0, 0), (1, 1)), make_board((0, 0), (2, 2))]
+
+
+def stub_fallback(agent):
+    """Replace the agent's fallback search with one that records its calls and plays the last legal move."""
+    calls = []
+
+    def get_move(board, deadline=None, stop_flag=None):
+        calls.append(board)
+        return board.get_valid_moves()[-1]
+
+    agent.fallback.get_move = get_move
+    return calls
+
+
+def test_batch_answers_one_move_per_game(boards):
+    model = StubModel('```json\n{"1": "1,1", "2": "0,1", "3": [1, 0]}\n```')
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=5.0)
+    fallback_calls = stub_fallback(agent)
+
+    assert agent.get_moves_batch(boards) == [(1, 1), (0, 1), (1, 0)]
+    assert len(model.prompts) == 1
+    assert fallback_calls == []
+
+
+def test_truncated_json_keeps_complete_entries(boards):
+    model = StubModel('{"1": "1,1", "2": "0,1", "3": "2,')
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=5.0)
+    fallback_calls = stub_fallback(agent)
+
+    moves = agent.get_moves_batch(boards)
+
+    assert moves[:2] == [(1, 1), (0, 1)]
+    assert fallback_calls == [boards[2]]
+    assert moves[2] == boards[2].get_valid_moves()[-1]
+
+
+def test_malformed_json_falls_back_for_every_position(boards):
+    model = StubModel('{"1": 1,1, "2": oops}')
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=5.0)
+    fallback_calls = stub_fallback(agent)
+
+    moves = agent.get_moves_batch(boards)
+
+    assert fallback_calls == boards
+    assert moves == [board.get_valid_moves()[-1] for board in boards]
+
+
+def test_missing_and_illegal_answers_fall_back(boards):
+    # Position 2 gets an occupied cell and position 3 is left out
+    model = StubModel('{"1": "0,2", "2": "1,1"}')
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=5.0)
+    fallback_calls = stub_fallback(agent)
+
+    moves = agent.get_moves_batch(boards)
+
+    assert moves[0] == (0, 2)
+    assert fallback_calls == boards[1:]
+    assert moves[1:] == [board.get_valid_moves()[-1] for board in boards[1:]]
+
+
+def test_no_json_without_deadline_plays_random_legal_moves(boards):
+    model = StubModel("I cannot answer that.")
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=None)
+
+    moves = agent.get_moves_batch(boards)
+
+    assert len(moves) == len(boards)
+    for board, move in zip(boards, moves):
+        assert move in board.get_valid_moves()
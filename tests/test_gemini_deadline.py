@@ -0,0 +1,86 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from agents.alphabeta_agent import SearchTimeout
+from agents.gemini_agent import GeminiAgent
+from conftest import StubModel
+from game.board import Board
+from utils.metrics import MetricsCollector
+
+
+@pytest.mark.parametrize('timeout', [None, 0.3])
+def test_fallback_moves_count_toward_gemini_time(timeout):
+    # An illegal answer is as good as no answer
+    agent = GeminiAgent('X', model=StubModel("9,9"), use_cache=False, timeout=timeout, fallback_depth=1)
+    with MetricsCollector.scoped() as metrics:
+        move = agent.get_move(Board(3))
+
+    assert move in Board(3).get_valid_moves()
+    assert metrics.algorithm_stats['gemini']['nodes_evaluated'] == 0
+    assert metrics.algorithm_stats['gemini']['execution_time'] > 0
+
+
+def make_board(moves, size=3):
+    """Build a board from (row, col, mark) moves."""
+    board = Board(size)
+    for row, col, mark in moves:
+        board.make_move(row, col, mark)
+    return board
+
+
+# X to move wins at (0, 2); any other answer is easy to tell from the fallback search's move
+WIN_IN_ONE = [(0, 0, 'X'), (1, 0, 'O'), (0, 1, 'X'), (1, 1, 'O')]
+
+
+def test_slow_answer_plays_the_fallback_move_at_the_deadline():
+    agent = GeminiAgent('X', model=StubModel((1.0, "2,2")), use_cache=False, timeout=0.3)
+
+    start = time.time()
+    move = agent.get_move(make_board(WIN_IN_ONE))
+    elapsed = time.time() - start
+
+    assert move == (0, 2)
+    assert 0.25 <= elapsed < 0.8
+
+
+@pytest.mark.parametrize('first_reply', [RuntimeError("quota exceeded"), (1.0, "0,2")],
+                         ids=['error', 'slow'])
+def test_hedged_request_answers_when_the_first_one_does_not(first_reply):
+    model = StubModel(first_reply, "2,2")
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=3.0, hedge_after=0.1)
+
+    start = time.time()
+    move = agent.get_move(make_board(WIN_IN_ONE))
+
+    assert move == (2, 2)
+    assert len(model.prompts) == 2
+    assert time.time() - start < 0.8
+
+
+def test_failed_requests_leave_the_fallback_searching_until_the_deadline():
+    model = StubModel(RuntimeError("unavailable"), RuntimeError("unavailable"))
+    agent = GeminiAgent('X', model=model, use_cache=False, timeout=0.5, hedge_after=0.05, fallback_depth=25)
+    board = Board(5)
+
+    start = time.time()
+    move = agent.get_move(board)
+    elapsed = time.time() - start
+
+    assert len(model.prompts) == 2
+    assert move in board.get_valid_moves()
+    assert elapsed >= 0.45
+    assert agent.fallback.last_search_info['depth_reached'] > 1
+
+
+def test_stop_flag_abandons_the_move():
+    agent = GeminiAgent('X', model=StubModel((1.0, "2,2")), use_cache=False, timeout=10.0, fallback_depth=25)
+    stop_flag = multiprocessing.Value('b', 0)
+    threading.Timer(0.2, lambda: setattr(stop_flag, 'value', 1)).start()
+
+    start = time.time()
+    with pytest.raises(SearchTimeout):
+        agent.get_move(Board(5), stop_flag=stop_flag)
+    assert time.time() - start < 0.8
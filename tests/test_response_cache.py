@@ -0,0 +1,96 @@
+from agents.gemini_agent import GeminiAgent
+from agents.response_cache import ResponseCache, get_response_cache
+from conftest import StubModel
+from game.board import Board
+from game.symmetry import get_canonicalizer
+
+
+def make_board(moves, size=3):
+    """Build a board from (row, col, mark) moves."""
+    board = Board(size)
+    for row, col, mark in moves:
+        board.make_move(row, col, mark)
+    return board
+
+
+def rotate(row, col, size=3):
+    """Rotate a cell a quarter turn clockwise."""
+    return col, size - 1 - row
+
+
+def test_rotated_position_is_a_hit_mapped_back_onto_the_board():
+    # No symmetry maps this position onto itself, so the rotated answer is the only right one
+    position = [(0, 0, 'X'), (0, 1, 'O')]
+    rotated = make_board([rotate(row, col) + (mark,) for row, col, mark in position])
+    model = StubModel("2,2")
+    agent = GeminiAgent('X', model=model, timeout=5.0)
+
+    assert agent.get_move(make_board(position)) == (2, 2)
+    assert agent.get_move(rotated) == rotate(2, 2)
+    assert len(model.prompts) == 1
+    assert agent.cache.get_stats()['hits'] == 1
+
+    # The cached move is stored in the canonical frame and mapped back with inverse_transform_move
+    canonicalizer = get_canonicalizer(3)
+    key, transform = canonicalizer.canonicalize(rotated)
+    stored = agent.cache.entries[(3, key, 'X')]
+    assert canonicalizer.inverse_transform_move(stored, transform) == rotate(2, 2)
+
+
+def test_positions_are_cached_per_mark():
+    cache = ResponseCache()
+    board = make_board([(1, 1, 'X')])
+    cache.put(board, 'O', (0, 0))
+
+    assert cache.get(board, 'X') is None
+    assert cache.get(board, 'O') == (0, 0)
+
+
+def test_least_recently_used_position_is_evicted_at_capacity():
+    cache = ResponseCache(max_entries=2)
+    corner, center, edge = make_board([(0, 0, 'X')]), make_board([(1, 1, 'X')]), make_board([(0, 1, 'X')])
+    cache.put(corner, 'O', (1, 1))
+    cache.put(center, 'O', (0, 0))
+    assert cache.get(corner, 'O') == (1, 1)  # Now the most recently used
+
+    cache.put(edge, 'O', (1, 1))
+
+    assert len(cache.entries) == 2
+    assert cache.get(center, 'O') is None
+    assert cache.get(corner, 'O') == (1, 1)
+    assert cache.get(edge, 'O') == (1, 1)
+
+
+def test_saved_cache_loads_with_entries_and_recency(tmp_path):
+    path = str(tmp_path / "cache" / "gemini_cache.json")
+    corner, center, edge = make_board([(0, 0, 'X')]), make_board([(1, 1, 'X')]), make_board([(0, 1, 'X')])
+    cache = ResponseCache(max_entries=2, path=path)
+    cache.put(corner, 'O', (1, 1))
+    cache.put(center, 'O', (0, 2))
+    cache.save()
+
+    loaded = ResponseCache(max_entries=2, path=path)
+    assert loaded.entries == cache.entries
+
+    # The oldest entry is still the first one evicted
+    loaded.put(edge, 'O', (1, 1))
+    assert loaded.get(corner, 'O') is None
+    assert loaded.get(center, 'O') == (0, 2)
+
+
+def test_agent_cache_persists_between_runs(tmp_path, monkeypatch):
+    path = str(tmp_path / "gemini_cache.json")
+    board = make_board([(0, 0, 'X'), (0, 1, 'O')])
+    agent = GeminiAgent('X', model=StubModel("2,2"), cache_path=path, timeout=5.0)
+    assert agent.get_move(board) == (2, 2)
+    agent.close()
+
+    # A fresh process starts without the shared in-memory cache
+    from agents import response_cache
+    monkeypatch.setattr(response_cache, '_CACHES', {})
+    model = StubModel()
+    agent = GeminiAgent('X', model=model, cache_path=path, timeout=5.0)
+
+    assert agent.cache is get_response_cache(path)
+    assert agent.get_move(board) == (2, 2)
+    assert model.prompts == []
@@ -0,0 +1,19 @@
+import time
+
+import pytest
+
+from agents.factory import get_agent
+from game.board import Board
+
+
+@pytest.mark.parametrize('agent_type', ['minimax', 'alphabeta', 'negamax'])
+def test_time_limit_bounds_a_deep_5x5_search(agent_type):
+    agent = get_agent(agent_type, 'X', 9, time_limit=0.2)
+    board = Board(5)
+
+    start = time.time()
+    move = agent.get_move(board)
+
+    assert time.time() - start < 1.0
+    assert move in board.get_valid_moves()
+    assert board.move_count == 0